@@ -1,11 +1,10 @@
 import itertools
-import json
 import os
 import aiohttp
 import discord
 
 from discord.ext import commands
-from utils import Cache, Twitch
+from utils import Cache, StorageBackend, Tokenizer, Twitch, create_storage
 
 
 class Client(commands.Bot):
@@ -20,6 +19,13 @@ class Client(commands.Bot):
         handler_paths: list[str],
         database_paths: dict[str, str],
         test_guild_id: int,
+        *,
+        database_flush_interval: float = 0.5,
+        blacklist_leetspeak: bool = True,
+        music_extraction_workers: int = 2,
+        music_opus_passthrough: bool = True,
+        music_cache_bytes: int = 0,
+        music_cache_min_plays: int = 3,
         **kwargs
     ) -> None:
         super().__init__(**kwargs)
@@ -27,6 +33,10 @@ class Client(commands.Bot):
         self.possible_status = possible_status
         self.session: aiohttp.ClientSession = None
         self.cache: Cache = None
+        self.music_extraction_workers = music_extraction_workers
+        self.music_opus_passthrough = music_opus_passthrough
+        self.music_cache_bytes = music_cache_bytes
+        self.music_cache_min_plays = music_cache_min_plays
 
         self.twitch: Twitch = None
         self.twitch_client_id = os.getenv("TWITCH_CLIENT_ID")
@@ -36,8 +46,12 @@ class Client(commands.Bot):
         self._handler_paths = handler_paths
         self._database_paths = database_paths
         self._test_guild_id = test_guild_id
+        self._storage: StorageBackend = create_storage(
+            database_paths, flush_interval=database_flush_interval
+        )
 
         self._fill_cache()
+        self.cache.tokenizer = Tokenizer(leetspeak=blacklist_leetspeak)
 
     @property
     def database_paths(self):
@@ -48,22 +62,9 @@ class Client(commands.Bot):
 
     def _fill_cache(self) -> None:
         """
-        Loads JSON database files and stores their data as a Cache object in self.cache.
+        Loads the database and stores its data as a Cache object in self.cache.
         """
-        temporary_cache = {}
-
-        for key, filepath in self._database_paths.items():
-            with open(filepath, "r") as file:
-                temporary_cache[key] = json.load(file)
-
-        self.cache = Cache(**temporary_cache)
-
-    def update_json(self, filename, payload) -> None:
-        """
-        Updates a modified Cache attribute and stores it in a JSON file.
-        """
-        with open(filename, "w") as file:
-            json.dump(payload, file, indent=4)
+        self.cache = self._storage.load()
 
     async def start(self, *args, **kwargs) -> None:
         """
@@ -71,9 +72,17 @@ class Client(commands.Bot):
         """
         async with aiohttp.ClientSession() as self.session:
             self.twitch = Twitch(self.twitch_client_id, self.twitch_client_secret)
+            self._storage.start()
 
             return await super().start(*args, **kwargs)
 
+    async def close(self) -> None:
+        """
+        Overrides Bot.close to write any pending database changes before exiting.
+        """
+        await super().close()
+        await self._storage.close()
+
     async def sync(self) -> None:
         """
         Syncs all application commands with Discord.
@@ -10,6 +10,7 @@ from discord.ext import commands
 from utils import (
     BlacklistClearButton,
     BlacklistAddView,
+    BlacklistMatcher,
     BlacklistRemoveView,
     ClearMessagesView,
 )
@@ -24,7 +25,6 @@ class AdminCog(commands.Cog, name="Admin"):
 
     def __init__(self, client: Client):
         self.client = client
-        self.blacklist_database_filepath = client.database_paths["blacklist"]
 
     @commands.command()
     @commands.has_permissions(manage_messages=True)
@@ -118,6 +118,8 @@ class AdminCog(commands.Cog, name="Admin"):
         """
         ⚙️ Bans words from being used.
 
+        ❓ Use * as a wildcard, or start a word with re: to use a regular expression.
+
         Usage:
         ```
         ~blacklist | ~bladd <...words>
@@ -132,9 +134,18 @@ class AdminCog(commands.Cog, name="Admin"):
             return
 
         id = str(ctx.guild.id)
-        words = {word.strip().lower() for word in words.split(" ")} - {
-            ""
-        }  # Remove empty strings ''
+        # Remove empty strings ''
+        words = {
+            BlacklistMatcher.normalize_entry(word) for word in words.split(" ")
+        } - {""}
+
+        for word in words:
+            try:
+                BlacklistMatcher.validate_entry(word)
+            except ValueError as error:
+                return await ctx.reply(
+                    f"❌ `{word}` can't be blacklisted. {error}", delete_after=20
+                )
 
         blacklist = self.client.cache.blacklist
         if id not in blacklist.keys():
@@ -156,7 +167,7 @@ class AdminCog(commands.Cog, name="Admin"):
         for word in words_:
             blacklist[id].append(word)
 
-        self.client.update_json(self.blacklist_database_filepath, blacklist)
+        self.client.cache.mark_dirty("blacklist", id)
 
         embed = discord.Embed(
             title=f"🛠️ Words Successfully Added",
@@ -168,6 +179,57 @@ class AdminCog(commands.Cog, name="Admin"):
 
         await ctx.send(embed=embed)
 
+    @commands.command()
+    @commands.has_permissions(manage_messages=True)
+    @commands.cooldown(1, 2, commands.BucketType.user)
+    async def antispam(
+        self, ctx: commands.Context, enabled: bool, messages: int = 4, seconds: int = 10
+    ):
+        """
+        ⚙️ Deletes messages that are repeated too often.
+
+        ❓ Messages are deleted when the same text is sent the given number of times
+        within the given number of seconds, by one member or in one channel.
+
+        Usage:
+        ```
+        ~antispam <on/off> [messages] [seconds]
+        ```
+        """
+        id = str(ctx.guild.id)
+        antispam = self.client.cache.antispam
+
+        if not enabled:
+            if id not in antispam.keys():
+                return await ctx.reply(
+                    f"❌ This server does not have anti-spam turned on.",
+                    delete_after=20,
+                )
+
+            del antispam[id]
+            self.client.cache.mark_dirty("antispam", id)
+            self.client.cogs.get("EventHandler").spam_detector.forget(ctx.guild.id)
+
+            embed = discord.Embed(title=f"🛠️ Anti-Spam Successfully Turned Off")
+            return await ctx.send(embed=embed)
+
+        if not 2 <= messages <= 10 or not 1 <= seconds <= 60:
+            return await ctx.reply(
+                f"❌ Please choose between 2 and 10 messages, and 1 and 60 seconds.",
+                delete_after=20,
+            )
+
+        antispam[id] = {"messages": messages, "seconds": seconds}
+        self.client.cache.mark_dirty("antispam", id)
+
+        embed = discord.Embed(
+            title=f"🛠️ Anti-Spam Successfully Turned On",
+            description=f"🔒 Messages sent **{messages}** times within "
+            + f"**{seconds}** seconds will be deleted.",
+        )
+
+        await ctx.send(embed=embed)
+
     @commands.command(aliases=["blclear"])
     @commands.has_permissions(manage_messages=True)
     async def clearblacklist(self, ctx: commands.Context):
@@ -238,9 +300,10 @@ class AdminCog(commands.Cog, name="Admin"):
             return
 
         id = str(ctx.guild.id)
-        words = {word.strip().lower() for word in words.split(" ")} - {
-            ""
-        }  # Remove empty strings ''
+        # Remove empty strings ''
+        words = {
+            BlacklistMatcher.normalize_entry(word) for word in words.split(" ")
+        } - {""}
 
         blacklist = self.client.cache.blacklist
 
@@ -263,7 +326,7 @@ class AdminCog(commands.Cog, name="Admin"):
         for word in words_:
             blacklist[id].remove(word)
 
-        self.client.update_json(self.blacklist_database_filepath, blacklist)
+        self.client.cache.mark_dirty("blacklist", id)
 
         embed = discord.Embed(
             title=f"🛠️ Words Successfully Removed",
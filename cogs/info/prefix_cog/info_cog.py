@@ -1,6 +1,8 @@
+import datetime
 import discord
 
 from client import Client
+from cogs.music.music_utils import audio_cache, extraction_cache, extraction_scheduler
 from discord import app_commands
 
 from ..info_commands import *
@@ -96,6 +98,72 @@ class InfoCog(commands.Cog, name="Info"):
         """
         await botinfo_callback(interaction, self.client)
 
+    @commands.command()
+    @commands.is_owner()
+    async def stats(self, ctx: commands.Context):
+        """
+        💡 Shows how the bot's background queues and caches are performing.
+
+        ❓ Only the bot's owner can use this command.
+
+        Usage:
+        ```
+        ~stats
+        ```
+        """
+        embed = discord.Embed(
+            title="📊 Bot Statistics",
+            description="❓ Counted since the bot started.",
+            timestamp=datetime.datetime.utcnow(),
+        )
+
+        deletions = self.client.cogs.get("EventHandler").deletion_queue.metrics
+        embed.add_field(
+            name="🗑️ Message Deletions",
+            value=f"Queued: **{deletions.queued}** | Deleted: **{deletions.deleted}** "
+            + f"| Failed: **{deletions.failed}**\n"
+            + f"Waiting: **{deletions.depth}** (at most **{deletions.max_depth}**)\n"
+            + f"Requests: **{deletions.bulk_requests}** bulk, "
+            + f"**{deletions.single_requests}** single\n"
+            + f"Latency: **{deletions.average_latency:.2f}s** on average, "
+            + f"**{deletions.max_latency:.2f}s** at most",
+            inline=False,
+        )
+
+        extractions = extraction_cache.metrics
+        embed.add_field(
+            name="🔎 Song Lookups",
+            value=f"Hit rate: **{extractions.hit_rate:.0%}**\n"
+            + f"Hits: **{extractions.hits}** | Shared: **{extractions.coalesced}** "
+            + f"| Misses: **{extractions.misses}** "
+            + f"| Evicted: **{extractions.evictions}**",
+            inline=False,
+        )
+
+        scheduler = extraction_scheduler.metrics
+        embed.add_field(
+            name="⏳ Song Extractions",
+            value=f"Queued: **{scheduler.queued}** | Done: **{scheduler.completed}** "
+            + f"| Failed: **{scheduler.failed}** | Rejected: **{scheduler.rejected}**\n"
+            + f"Waiting: **{scheduler.depth}** (at most **{scheduler.max_depth}**)\n"
+            + f"Wait: **{scheduler.average_wait:.2f}s** on average, "
+            + f"**{scheduler.max_wait:.2f}s** at most",
+            inline=False,
+        )
+
+        if audio_cache.enabled:
+            cached = audio_cache.metrics
+            embed.add_field(
+                name="💾 Audio Cache",
+                value=f"Hit rate: **{cached.hit_rate:.0%}** | "
+                + f"Size: **{audio_cache.size / 1e6:.1f}MB** of "
+                + f"**{audio_cache.max_bytes / 1e6:.1f}MB**\n"
+                + f"Downloads: **{cached.downloads}** | Failed: **{cached.failed}** "
+                + f"| Evicted: **{cached.evictions}**",
+                inline=False,
+            )
+
+        await ctx.send(embed=embed)
 
 
 async def setup(client: commands.Bot):
@@ -1,4 +1,5 @@
 import requests
+import time
 import datetime
 import discord
 import re
@@ -41,3 +42,73 @@ async def fetch_from_youtube(search: str):
     embed.set_footer(text=f"❓ Follow the link above to view the video.")
 
     return embed, url
+
+
+POLL_DURATION = re.compile(r"(\d+)([smhd])")
+POLL_DURATION_UNITS = {"s": 1, "m": 60, "h": 3600, "d": 86400}
+POLL_MAX_DURATION = datetime.timedelta(days=7)
+POLL_OPTION_EMOJIS = [
+    "1️⃣",
+    "2️⃣",
+    "3️⃣",
+    "4️⃣",
+    "5️⃣",
+    "6️⃣",
+    "7️⃣",
+    "8️⃣",
+    "9️⃣",
+    "🔟",
+]
+
+
+def parse_poll_duration(duration: str) -> float:
+    """
+    Converts a duration such as 30m or 2h into seconds.
+    """
+    match = POLL_DURATION.fullmatch(duration.strip().lower())
+
+    if match is None:
+        raise ValueError("Durations look like `30s`, `10m`, `2h` or `1d`.")
+
+    seconds = int(match[1]) * POLL_DURATION_UNITS[match[2]]
+
+    if not 0 < seconds <= POLL_MAX_DURATION.total_seconds():
+        raise ValueError("Polls can be open for at most 7 days.")
+
+    return seconds
+
+
+def create_poll(
+    channel: discord.abc.GuildChannel,
+    author: str,
+    question: str,
+    labels: list[str],
+    duration: float = None,
+) -> dict:
+    """
+    Returns the database entry for a new poll, without its message ID. Without any
+    options, the poll is a yes or no question.
+    """
+    labels = [label.strip() for label in labels if label.strip()]
+
+    if len(labels) == 1 or len(labels) > len(POLL_OPTION_EMOJIS):
+        raise ValueError(
+            f"Polls need between 2 and {len(POLL_OPTION_EMOJIS)} options, or none "
+            + "for a yes or no question."
+        )
+
+    if not labels:
+        options = [["✔️", "Yes"], ["❌", "No"]]
+    else:
+        options = [list(option) for option in zip(POLL_OPTION_EMOJIS, labels)]
+
+    return {
+        "msg_id": None,
+        "channel_id": channel.id,
+        "guild_id": channel.guild.id,
+        "author": author,
+        "question": question,
+        "options": options,
+        "closes_at": None if duration is None else time.time() + duration,
+        "votes": {},
+    }
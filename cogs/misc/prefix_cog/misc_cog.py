@@ -11,11 +11,16 @@ import requests
 
 from typing import Optional
 from discord.ext import commands
-from utils import TwitchBroadcast, ViewYoutubeButton
+from utils import TwitchBroadcast, ViewYoutubeButton, poll_embed
 from urllib import parse, request
 from bs4 import BeautifulSoup
 
-from ..misc_utils import fetch_from_youtube
+from ..misc_utils import (
+    POLL_DURATION,
+    create_poll,
+    fetch_from_youtube,
+    parse_poll_duration,
+)
 
 
 class MiscCog(commands.Cog, name="Misc"):
@@ -153,36 +158,52 @@ class MiscCog(commands.Cog, name="Misc"):
         await ctx.reply(embed=meme)
 
     @commands.command()
+    @commands.guild_only()
     async def poll(self, ctx: commands.Context, *, poll: str):
         """
-        🎲 Creates a simple yes or no poll.
+        🎲 Creates a poll with up to 10 options, or a yes or no poll if none are
+        given. The results update live, and the poll closes after the duration if
+        one is given.
 
         ❓ This command is also available as a slash command.
 
         Usage:
         ```
-        ~poll <question> [...options]
+        ~poll [duration] <question> [| option | option ...]
         ```
         Or:
         ```
-        /poll <question>
+        /poll <question> [options] [duration]
         ```
         """
-        if not poll:
+        question, *labels = poll.split("|")
+        duration, _, rest = question.strip().partition(" ")
+
+        try:
+            if rest and POLL_DURATION.fullmatch(duration.lower()):
+                question, duration = rest, parse_poll_duration(duration)
+            else:
+                duration = None
+
+            entry = create_poll(
+                ctx.channel, ctx.author.name, question.strip(), labels, duration
+            )
+        except ValueError as error:
+            return await ctx.reply(f":x: {error}", delete_after=20)
+
+        if not entry["question"]:
             return await ctx.reply(
                 f":x: You need to specify a question.", delete_after=20
             )
 
-        embed = discord.Embed(
-            title=f"📢 Poll by **{ctx.author.name}**:",
-            description=f"```❓ {' '.join(poll)}```\n",
-        )
+        message = await ctx.send(embed=poll_embed(entry, {}))
+        entry["msg_id"] = message.id
 
-        embed.set_footer(text="Vote ✔️ Yes or ❌ No.")
-        message = await ctx.send(embed=embed)
+        self.client.cache.polls.add(entry)
+        self.client.cache.mark_dirty("polls", message.id)
 
-        await message.add_reaction("✔️")
-        return await message.add_reaction("❌")
+        for emoji, _ in entry["options"]:
+            await message.add_reaction(emoji)
 
     @commands.command()
     async def echo(self, ctx: commands.Context, *, message: str):
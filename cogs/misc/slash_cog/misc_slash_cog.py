@@ -9,9 +9,9 @@ import humanize
 
 from discord import app_commands
 from discord.ext import commands
-from utils import TwitchBroadcast, ViewYoutubeButton
+from utils import TwitchBroadcast, ViewYoutubeButton, poll_embed
 
-from ..misc_utils import fetch_from_youtube
+from ..misc_utils import create_poll, fetch_from_youtube, parse_poll_duration
 
 
 class MiscSlashCog(commands.Cog):
@@ -154,40 +154,65 @@ class MiscSlashCog(commands.Cog):
         await interaction.followup.send(embed=meme)
 
     @app_commands.command()
-    @app_commands.describe(poll="❓ The question to ask the poll for.")
-    async def poll(self, interaction: discord.Interaction, *, poll: str):
+    @app_commands.describe(
+        poll="❓ The question to ask the poll for.",
+        options="❓ Up to 10 options separated by |. Leave empty for yes or no.",
+        duration="❓ How long the poll is open for, e.g. 30m, 2h or 1d.",
+    )
+    async def poll(
+        self,
+        interaction: discord.Interaction,
+        *,
+        poll: str,
+        options: str = None,
+        duration: str = None,
+    ):
         """
-        🎲 Creates a simple yes or no poll.
+        🎲 Creates a poll with up to 10 options, or a yes or no poll if none are
+        given. The results update live, and the poll closes after the duration if
+        one is given.
 
         ❓ This command is also available as a prefix command.
 
         Usage:
         ```
-        /poll <question>
+        /poll <question> [options] [duration]
         ```
         Or:
         ```
-        ~poll <question>
+        ~poll [duration] <question> [| option | option ...]
         ```
         """
         await interaction.response.defer()
 
-        if not poll:
+        if not poll or interaction.guild is None:
             return await interaction.followup.send(
-                f":x: You need to specify a question.",
+                f":x: You need to specify a question in a server.",
                 ephemeral=True,
             )
 
-        embed = discord.Embed(
-            title=f"📢 Poll by **{interaction.user.name}**:",
-            description=f"```❓ {poll}```\n",
-        )
+        try:
+            if duration is not None:
+                duration = parse_poll_duration(duration)
+
+            entry = create_poll(
+                interaction.channel,
+                interaction.user.name,
+                poll,
+                (options or "").split("|"),
+                duration,
+            )
+        except ValueError as error:
+            return await interaction.followup.send(f":x: {error}", ephemeral=True)
+
+        message = await interaction.followup.send(embed=poll_embed(entry, {}))
+        entry["msg_id"] = message.id
 
-        embed.set_footer(text="Vote ✔️ Yes or ❌ No.")
-        message = await interaction.followup.send(embed=embed)
+        self.client.cache.polls.add(entry)
+        self.client.cache.mark_dirty("polls", message.id)
 
-        await message.add_reaction("✔️")
-        return await message.add_reaction("❌")
+        for emoji, _ in entry["options"]:
+            await message.add_reaction(emoji)
 
     @app_commands.command()
     @app_commands.describe(message="❓ The phrase you want the bot to repeat.")
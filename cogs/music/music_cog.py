@@ -1,10 +1,20 @@
 import asyncio
-import itertools
 
 import discord
 import discord.ext.commands as commands
+from utils import QueueView
 from .music_player import MusicPlayer
-from .music_utils import InvalidVC, VCError, YTDLSource
+from .music_utils import (
+    ExtractionQueueFull,
+    InvalidVC,
+    VCError,
+    YTDLSource,
+    audio_cache,
+    extraction_scheduler,
+)
+
+# How many songs ~queue shows on each page
+QUEUE_PAGE_SIZE = 10
 
 
 class MusicCog(commands.Cog, name="Music"):
@@ -18,6 +28,20 @@ class MusicCog(commands.Cog, name="Music"):
         self.bot = bot
         self.players = {}
 
+        extraction_scheduler.max_workers = bot.music_extraction_workers
+        YTDLSource.opus_passthrough = bot.music_opus_passthrough
+
+        audio_cache.max_bytes = bot.music_cache_bytes
+        audio_cache.min_plays = bot.music_cache_min_plays
+        audio_cache.load()
+
+    def cog_unload(self):
+        """
+        Shuts down the extraction and download processes when the cog is unloaded.
+        """
+        extraction_scheduler.close()
+        audio_cache.close()
+
     async def cleanup(self, guild):
         """
         Destroys the music player and disconnects from a voice channel.
@@ -112,7 +136,8 @@ class MusicCog(commands.Cog, name="Music"):
                 raise VCError(f":x: Connecting to channel **{channel}** timed out.")
 
         embed = discord.Embed(
-            title=f"🎧 Successfully Connected", description=f"```🎶 Channel: {channel}```"
+            title=f"🎧 Successfully Connected",
+            description=f"```🎶 Channel: {channel}```",
         )
         embed.set_footer(text="❓ You can use ~del to kick me at any time.")
         await ctx.send(embed=embed)
@@ -124,7 +149,7 @@ class MusicCog(commands.Cog, name="Music"):
 
         Usage:
         ```
-        ~play | ~p <song>
+        ~play | ~p <song or playlist link>
         ```
         """
         await ctx.trigger_typing()
@@ -141,11 +166,26 @@ class MusicCog(commands.Cog, name="Music"):
             await ctx.invoke(self.connect)
 
         player = self.get_player(ctx)
-        source = await YTDLSource.create_source(
-            ctx, search, loop=self.bot.loop, download=False
-        )
 
-        await player.queue.put(source)
+        try:
+            if YTDLSource.is_playlist(search):
+                sources = await YTDLSource.create_playlist(ctx, search)
+            else:
+                sources = [
+                    await YTDLSource.create_source(
+                        ctx, search, loop=self.bot.loop, download=False
+                    )
+                ]
+        except ExtractionQueueFull:
+            return await ctx.reply(
+                f":x: Too many songs are being searched for. Try again in a moment.",
+                delete_after=20,
+            )
+
+        for source in sources:
+            player.queue.put(source)
+
+        player.prefetch()
 
     @commands.command(aliases=["ps"])
     async def pause(self, ctx: commands.Context):
@@ -236,13 +276,13 @@ class MusicCog(commands.Cog, name="Music"):
         await ctx.send(embed=embed)
 
     @commands.command(aliases=["q", "songs"])
-    async def queue(self, ctx: commands.Context):
+    async def queue(self, ctx: commands.Context, page: int = 1):
         """
         🎵 Shows the current music queue.
 
         Usage:
         ```
-        ~queue | ~q | ~songs
+        ~queue | ~q | ~songs [page]
         ```
         """
         vc = ctx.voice_client
@@ -257,18 +297,103 @@ class MusicCog(commands.Cog, name="Music"):
                 delete_after=20,
             )
 
-        # Grab up to 5 entries from the queue...
-        upcoming = list(itertools.islice(player.queue._queue, 0, 5))
+        view = QueueView(ctx, player.queue, page=page - 1, per_page=QUEUE_PAGE_SIZE)
+        view.message = await ctx.send(embed=view.embed(), view=view)
+
+    @commands.command(aliases=["rm"])
+    async def remove(self, ctx: commands.Context, position: int):
+        """
+        🎵 Removes a song from the queue.
+
+        Usage:
+        ```
+        ~remove | ~rm <position>
+        ```
+        """
+        vc = ctx.voice_client
+
+        if not vc or not vc.is_connected():
+            return await ctx.reply(f":x: I'm not connected to VC.", delete_after=20)
+
+        player = self.get_player(ctx)
+
+        if not 0 < position <= len(player.queue):
+            return await ctx.reply(
+                f":x: There's no song at position {position} in the queue.",
+                delete_after=20,
+            )
+
+        song = player.queue.remove(position - 1)
+        player.prefetch()
 
-        fmt = "\n\n".join(
-            f'➡️ **{i + 1}**: {song["title"]}' for i, song in enumerate(upcoming)
+        embed = discord.Embed(
+            title=f"🎧 Removed a Song",
+            description=f'🗑️ **{ctx.author.name}**: Removed *{song["title"]}*',
         )
+        await ctx.send(embed=embed)
+
+    @commands.command(aliases=["mv"])
+    async def move(self, ctx: commands.Context, position: int, to: int):
+        """
+        🎵 Moves a song to a different position in the queue.
+
+        Usage:
+        ```
+        ~move | ~mv <position> <new position>
+        ```
+        """
+        vc = ctx.voice_client
+
+        if not vc or not vc.is_connected():
+            return await ctx.reply(f":x: I'm not connected to VC.", delete_after=20)
+
+        player = self.get_player(ctx)
+
+        if not 0 < position <= len(player.queue) or not 0 < to <= len(player.queue):
+            return await ctx.reply(
+                f":x: The queue only has {len(player.queue)} songs.",
+                delete_after=20,
+            )
+
+        song = player.queue.move(position - 1, to - 1)
+        player.prefetch()
+
         embed = discord.Embed(
-            title=f"🎧 Music Queue | {len(upcoming)} Songs",
-            description=fmt,
+            title=f"🎧 Moved a Song",
+            description=f'↕️ **{ctx.author.name}**: Moved *{song["title"]}* to {to}',
         )
+        await ctx.send(embed=embed)
 
-        embed.set_footer(text=f"❓ You can use ~skip to skip to the song at the top.")
+    @commands.command(aliases=["mix"])
+    async def shuffle(self, ctx: commands.Context):
+        """
+        🎵 Shuffles the queue.
+
+        Usage:
+        ```
+        ~shuffle | ~mix
+        ```
+        """
+        vc = ctx.voice_client
+
+        if not vc or not vc.is_connected():
+            return await ctx.reply(f":x: I'm not connected to VC.", delete_after=20)
+
+        player = self.get_player(ctx)
+
+        if len(player.queue) < 2:
+            return await ctx.reply(
+                f":x: There aren't enough queued songs to shuffle.",
+                delete_after=20,
+            )
+
+        player.queue.shuffle()
+        player.prefetch()
+
+        embed = discord.Embed(
+            title=f"🎧 Shuffled the Queue",
+            description=f"🔀 Shuffled by **{ctx.author.name}**",
+        )
         await ctx.send(embed=embed)
 
     @commands.command(aliases=["np"])
@@ -331,11 +456,7 @@ class MusicCog(commands.Cog, name="Music"):
             )
 
         player = self.get_player(ctx)
-
-        if vc.source:
-            vc.source.volume = vol / 100
-
-        player.volume = vol / 100
+        player.set_volume(vol / 100)
 
         embed = discord.Embed(
             title="🎧 Volume Changed",
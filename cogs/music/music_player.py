@@ -1,9 +1,9 @@
 import asyncio
+import time
 import discord
 
-from async_timeout import timeout
 from discord.ext import commands
-from .music_utils import YTDLSource
+from .music_utils import SongQueue, YTDLOpusSource, YTDLSource, audio_cache
 
 
 class MusicPlayer:
@@ -21,10 +21,12 @@ class MusicPlayer:
         "current",
         "np",
         "volume",
+        "gap",
+        "_prefetch",
     )
 
     def __init__(self, ctx: commands.Context):
-        self.queue = asyncio.Queue()
+        self.queue = SongQueue()
         self.next = asyncio.Event()
 
         self.bot = ctx.bot
@@ -33,8 +35,13 @@ class MusicPlayer:
         self._cog = ctx.cog
 
         self.np = None  # Now playing message
-        self.volume = 0.5
+        # Opus streams are only passed through untouched at full volume
+        self.volume = 1.0 if YTDLSource.opus_passthrough else 0.5
         self.current = None
+        self.gap = 0.0  # Seconds between taking the last song and playing it
+
+        # The next queued song and the task resolving its stream
+        self._prefetch: tuple[dict, asyncio.Task] = None
 
         ctx.bot.loop.create_task(self.player_loop())
 
@@ -49,18 +56,17 @@ class MusicPlayer:
 
             try:
                 # Wait for the next song. If we timeout, cancel player and dc
-                async with timeout(300):  # Wait 5 mins
-                    source = await self.queue.get()
+                source = await self.queue.get(timeout=300)  # Wait 5 mins
             except asyncio.TimeoutError:
                 return self.destroy(self._guild)
 
-            if not isinstance(source, YTDLSource):
+            started = time.perf_counter()
+
+            if not isinstance(source, discord.AudioSource):
                 # Source was probably not downloaded
-                # So we should regather
+                # So we should regather, unless it was prefetched
                 try:
-                    source = await YTDLSource.regather_stream(
-                        source, loop=self.bot.loop
-                    )
+                    source = await self._resolve(source)
                 except Exception as e:
                     await self._channel.send(
                         f":x: Sorry, I couldn't process your song.\n" + f"\n[{e}]\n",
@@ -68,7 +74,9 @@ class MusicPlayer:
                     )
                     continue
 
-            source.volume = self.volume
+            if isinstance(source, discord.PCMVolumeTransformer):  # Downloaded
+                source.volume = self.volume
+
             self.current = source
 
             self._guild.voice_client.play(
@@ -76,6 +84,10 @@ class MusicPlayer:
                 after=lambda _: self.bot.loop.call_soon_threadsafe(self.next.set),
             )
 
+            self.gap = time.perf_counter() - started
+            self.prefetch()
+            audio_cache.record_play(source.web_url)
+
             embed = discord.Embed(
                 title=f"🎧 **Now Playing:** *{source.title}*",
                 description=f"🎵 Requested by: **{source.requester.name}**",
@@ -85,9 +97,10 @@ class MusicPlayer:
 
             await self.next.wait()
 
-            # Make sure the FFmpeg process is cleaned up.
+            # Make sure the FFmpeg process is cleaned up. The current source may have
+            # been replaced by set_volume since it started playing.
             try:
-                source.cleanup()
+                self.current.cleanup()
             except ValueError as ex:
                 error_embed = discord.Embed(
                     title="👎 Discord.py Error",
@@ -108,6 +121,95 @@ class MusicPlayer:
             except discord.HTTPException:
                 pass
 
+    def prefetch(self):
+        """
+        Starts resolving the next queued song's stream while the current one plays,
+        so it can start as soon as the current one ends.
+        """
+        if self.current is None:
+            return
+
+        entry = self.queue.peek()
+
+        if self._prefetch is not None:
+            if self._prefetch[0] is entry:
+                return
+
+            # The queue was reordered, so a different song is next
+            self._prefetch[1].cancel()
+            self._prefetch = None
+
+        if entry is None or isinstance(entry, YTDLSource):  # Already has a source
+            return
+
+        if entry["webpage_url"] in audio_cache:  # Will be played from disk
+            return
+
+        task = self.bot.loop.create_task(
+            YTDLSource.resolve_stream(entry, loop=self.bot.loop)
+        )
+        self._prefetch = (entry, task)
+
+    async def _resolve(self, entry: dict) -> YTDLSource:
+        """
+        Creates the source for a queued song, playing it from the audio cache if
+        it's there, or using its prefetched stream if it has one that hasn't expired.
+        """
+        prefetch, self._prefetch = self._prefetch, None
+        cached = audio_cache.get(entry["webpage_url"])
+
+        if cached is not None:
+            if prefetch is not None:
+                prefetch[1].cancel()
+
+            return YTDLSource.from_file(entry, *cached, volume=self.volume)
+
+        if prefetch is not None and prefetch[0] is entry:
+            try:
+                data = await prefetch[1]
+            except Exception:  # Try again below
+                data = None
+
+            if data is not None and time.time() < data["expires_at"]:
+                return YTDLSource.from_stream(
+                    data, requester=entry["requester"], volume=self.volume
+                )
+
+        elif prefetch is not None:  # The queue changed since it was prefetched
+            prefetch[1].cancel()
+
+        return await YTDLSource.regather_stream(
+            entry, loop=self.bot.loop, volume=self.volume
+        )
+
+    def set_volume(self, volume: float):
+        """
+        Changes the volume of the current song and the songs after it.
+        """
+        self.volume = volume
+        source, vc = self.current, self._guild.voice_client
+
+        if source is None or vc is None:
+            return
+
+        if not isinstance(source, YTDLOpusSource):
+            source.volume = volume
+            return
+
+        # FFmpeg applies the volume, so restart it from the same position, unless
+        # the stream URL has expired. Then the volume applies from the next song
+        if source.volume == volume or time.time() >= source.data["expires_at"]:
+            return
+
+        paused = vc.is_paused()
+
+        self.current = source.with_volume(volume)
+        vc.source = self.current  # This resumes the player
+        source.cleanup()
+
+        if paused:
+            vc.pause()
+
     def destroy(self, guild):
         """
         Disconnect and clean up the player.
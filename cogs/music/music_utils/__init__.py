@@ -1,2 +1,9 @@
-from .music_exceptions import VCError, InvalidVC
-from .yt_dl_source import YTDLSource
+from .music_exceptions import VCError, InvalidVC, ExtractionQueueFull
+from .song_queue import SongQueue
+from .ytdl_opus_source import YTDLOpusSource
+from .yt_dl_source import (
+    YTDLSource,
+    audio_cache,
+    extraction_cache,
+    extraction_scheduler,
+)
@@ -1,20 +1,3 @@
-from youtube_dl import YoutubeDL
-
-
-ytdl_options = {
-    "format": "bestaudio/best",
-    "outtmpl": "downloads/%(extractor)s-%(id)s-%(title)s.%(ext)s",
-    "restrictfilenames": True,
-    "noplaylist": True,
-    "nocheckcertificate": True,
-    "ignoreerrors": False,
-    "logtostderr": False,
-    "quiet": True,
-    "no_warnings": True,
-    "default_search": "auto",
-    "source_address": "0.0.0.0",
-}
+from workers.extraction_worker import ytdl, ytdl_options
 
 ffmpeg_options = {"before_options": "-nostdin", "options": "-vn"}
-
-ytdl = YoutubeDL(ytdl_options)
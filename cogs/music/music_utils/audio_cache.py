@@ -0,0 +1,247 @@
+import asyncio
+import concurrent.futures
+import hashlib
+import multiprocessing
+import os
+import re
+import sys
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from workers.extraction_worker import download_audio
+from .extraction_cache import ExtractionCache
+
+# Names of the cache's files, <key>.<acodec>.<ext>, where codecs can have numbered
+# parts like mp4a.40.2. Anything else in the directory, such as files youtube_dl is
+# still writing or other downloads, is left alone
+FILENAME = re.compile(r"([0-9a-f]{20})\.([\w-]+(?:\.\d+)*)\.\w+")
+
+
+@dataclass(slots=True, kw_only=True, repr=True)
+class AudioCacheMetrics:
+    hits: int = 0
+    misses: int = 0
+    downloads: int = 0
+    failed: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Returns the share of songs that were played from disk.
+        """
+        lookups = self.hits + self.misses
+        return self.hits / lookups if lookups else 0.0
+
+
+class AudioDiskCache:
+    """
+    Opt-in LRU cache of downloaded audio for songs that are played often, shared by
+    every guild.
+
+    Songs are counted each time they start playing, and once one has been played
+    min_plays times its audio is downloaded in a background worker process. Later
+    plays are served from disk, skipping extraction and remote streaming. The files
+    are kept under max_bytes in total, deleting the least recently played first.
+    The cache is disabled while max_bytes is 0.
+    """
+
+    def __init__(
+        self,
+        directory: str = "downloads",
+        *,
+        max_bytes: int = 0,
+        min_plays: int = 3,
+        max_tracked: int = 4096,
+    ):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.min_plays = min_plays
+        self.max_tracked = max_tracked
+        self.metrics = AudioCacheMetrics()
+        self.size = 0
+
+        self._files: OrderedDict[str, tuple[str, str, int]] = OrderedDict()
+        self._plays: OrderedDict[str, int] = OrderedDict()
+        self._downloading: set[str] = set()
+        self._executor: concurrent.futures.ProcessPoolExecutor = None
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    @staticmethod
+    def key(url: str) -> str:
+        """
+        Returns the name a song's file is stored under, which is the same for every
+        URL ExtractionCache treats as the same song.
+        """
+        return hashlib.sha1(ExtractionCache.normalize(url).encode()).hexdigest()[:20]
+
+    def __contains__(self, url: str) -> bool:
+        return self.enabled and self.key(url) in self._files
+
+    def load(self) -> None:
+        """
+        Indexes the cache's files already in its directory, oldest first, and
+        deletes any over the size limit.
+        """
+        if not self.enabled:
+            return
+
+        os.makedirs(self.directory, exist_ok=True)
+
+        with os.scandir(self.directory) as entries:
+            files = [
+                (entry, match)
+                for entry in entries
+                if (match := FILENAME.fullmatch(entry.name)) and entry.is_file()
+            ]
+
+        for entry, match in sorted(files, key=lambda file: file[0].stat().st_mtime):
+            key, acodec = match.groups()
+            self._store(key, entry.path, acodec, entry.stat().st_size)
+
+        self._evict()
+
+    def get(self, url: str) -> tuple[str, str] | None:
+        """
+        Returns the path and audio codec of a song's file, or None if it isn't
+        cached.
+        """
+        if not self.enabled:
+            return None
+
+        key = self.key(url)
+        entry = self._files.get(key)
+
+        if entry is not None and not os.path.exists(entry[0]):  # Deleted by hand
+            self._forget(key)
+            entry = None
+
+        if entry is None:
+            self.metrics.misses += 1
+            return None
+
+        self._files.move_to_end(key)
+        self.metrics.hits += 1
+
+        return entry[0], entry[1]
+
+    def record_play(self, url: str) -> None:
+        """
+        Counts a play of a song, and starts downloading it once it's been played
+        often enough.
+        """
+        if not self.enabled or not url:
+            return
+
+        key = self.key(url)
+
+        if key in self._files or key in self._downloading:
+            return
+
+        plays = self._plays.pop(key, 0) + 1
+
+        if plays < self.min_plays:
+            self._plays[key] = plays
+
+            while len(self._plays) > self.max_tracked:  # Forget the oldest counts
+                self._plays.popitem(last=False)
+
+            return
+
+        self._downloading.add(key)
+        asyncio.create_task(self._download(key, url))
+
+    def close(self) -> None:
+        """
+        Shuts down the download process.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        """
+        Returns the download process pool, starting it if needed.
+        """
+        if self._executor is None:
+            # One download at a time, in its own process so it doesn't compete with
+            # the extraction workers or hold the event loop's GIL
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=1,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        return self._executor
+
+    async def _download(self, key: str, url: str) -> None:
+        """
+        Downloads a song into the cache.
+        """
+        loop = asyncio.get_running_loop()
+
+        try:
+            path = await loop.run_in_executor(
+                self._get_executor(), download_audio, url, self.directory, key
+            )
+            size = os.path.getsize(path)
+        except concurrent.futures.process.BrokenProcessPool as error:
+            self._executor = None  # Start a new pool for the next one
+            self._failed(url, error)
+        except Exception as error:
+            self._failed(url, error)
+        else:
+            self.metrics.downloads += 1
+
+            if size > self.max_bytes:  # Would push everything else out
+                return os.remove(path)
+
+            match = FILENAME.fullmatch(os.path.basename(path))
+
+            if match is None:  # An unusual codec name, which load() would skip
+                return os.remove(path)
+
+            self._store(key, path, match[2], size)
+            self._evict()
+        finally:
+            self._downloading.discard(key)
+
+    def _failed(self, url: str, error: Exception) -> None:
+        """
+        Logs a download that failed. It's tried again after min_plays more plays.
+        """
+        self.metrics.failed += 1
+        print(f"Couldn't cache {url}: {error}", file=sys.stderr)
+
+    def _store(self, key: str, path: str, acodec: str, size: int) -> None:
+        """
+        Adds a file to the cache as the most recently played.
+        """
+        self._forget(key)
+        self._files[key] = (path, acodec, size)
+        self.size += size
+
+    def _forget(self, key: str) -> None:
+        """
+        Removes a file from the index, without deleting it.
+        """
+        entry = self._files.pop(key, None)
+
+        if entry is not None:
+            self.size -= entry[2]
+
+    def _evict(self) -> None:
+        """
+        Deletes the least recently played files until the cache fits in max_bytes.
+        """
+        while self._files and self.size > self.max_bytes:
+            key, (path, _, _) = next(iter(self._files.items()))
+            self._forget(key)
+            self.metrics.evictions += 1
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
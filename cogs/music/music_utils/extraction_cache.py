@@ -0,0 +1,139 @@
+import asyncio
+import time
+
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Awaitable, Callable
+from urllib import parse
+
+
+@dataclass(slots=True, kw_only=True, repr=True)
+class ExtractionMetrics:
+    hits: int = 0
+    misses: int = 0
+    coalesced: int = 0
+    evictions: int = 0
+
+    @property
+    def hit_rate(self) -> float:
+        """
+        Returns the share of lookups that didn't need their own extraction.
+        """
+        lookups = self.hits + self.misses + self.coalesced
+        return (self.hits + self.coalesced) / lookups if lookups else 0.0
+
+
+class ExtractionCache:
+    """
+    LRU cache of youtube_dl extraction results, shared by every guild.
+
+    Results are keyed by their normalized search or URL, and also by the video's
+    own URL, so a song that was searched for can be streamed without extracting
+    it again. Metadata is kept for metadata_ttl seconds, but a result's stream URL
+    is only used until it expires. Concurrent lookups for the same key share one
+    extraction instead of each starting their own.
+    """
+
+    def __init__(self, *, maxsize: int = 512, metadata_ttl: float = 6 * 3600):
+        self.maxsize = maxsize
+        self.metadata_ttl = metadata_ttl
+        self.metrics = ExtractionMetrics()
+
+        self._entries: OrderedDict[str, tuple[dict, float]] = OrderedDict()
+        self._inflight: dict[str, asyncio.Task] = {}
+
+    @staticmethod
+    def normalize(query: str) -> str:
+        """
+        Returns the cache key for a search or URL. YouTube video URLs are reduced to
+        their video ID, so links with timestamps or playlist parameters match.
+        """
+        query = query.strip()
+        url = parse.urlparse(query)
+
+        if not url.scheme:  # A search, which isn't case or whitespace sensitive
+            return " ".join(query.casefold().split())
+
+        host = url.netloc.lower().removeprefix("www.").removeprefix("m.")
+
+        if host == "youtu.be":
+            return f"youtube:{url.path.strip('/')}"
+
+        if host == "youtube.com" and url.path == "/watch":
+            video_id = parse.parse_qs(url.query).get("v")
+
+            if video_id:
+                return f"youtube:{video_id[0]}"
+
+        return query
+
+    async def get(
+        self,
+        query: str,
+        extract: Callable[[str], Awaitable[dict]],
+        *,
+        stream: bool = True,
+    ) -> dict:
+        """
+        Returns the extraction result for a search or URL, calling extract if there
+        isn't a usable one cached. If stream is True, the result's stream URL must
+        not have expired.
+        """
+        key = self.normalize(query)
+        entry = self._entries.get(key)
+
+        if entry is not None and self._is_fresh(*entry, stream=stream):
+            self._entries.move_to_end(key)
+            self.metrics.hits += 1
+            return dict(entry[0])
+
+        task = self._inflight.get(key)
+
+        if task is None:
+            self.metrics.misses += 1
+            task = asyncio.create_task(self._extract(key, query, extract))
+
+            self._inflight[key] = task
+            task.add_done_callback(lambda _: self._inflight.pop(key, None))
+        else:
+            self.metrics.coalesced += 1
+
+        # Shield the shared extraction, so one caller being cancelled doesn't cancel
+        # it for the rest
+        return dict(await asyncio.shield(task))
+
+    async def _extract(
+        self, key: str, query: str, extract: Callable[[str], Awaitable[dict]]
+    ) -> dict:
+        """
+        Runs an extraction and caches its result.
+        """
+        data = await extract(query)
+        self._store(key, data)
+
+        if data.get("webpage_url"):
+            self._store(self.normalize(data["webpage_url"]), data)
+
+        return data
+
+    def _store(self, key: str, data: dict) -> None:
+        """
+        Caches a result, evicting the least recently used ones over the limit.
+        """
+        self._entries[key] = (data, time.time())
+        self._entries.move_to_end(key)
+
+        while len(self._entries) > self.maxsize:
+            self._entries.popitem(last=False)
+            self.metrics.evictions += 1
+
+    def _is_fresh(self, data: dict, stored_at: float, *, stream: bool) -> bool:
+        """
+        Returns whether a cached result can still be used.
+        """
+        now = time.time()
+
+        if stream:
+            return now < data.get("expires_at", 0)
+
+        return now < stored_at + self.metadata_ttl
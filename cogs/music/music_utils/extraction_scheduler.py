@@ -0,0 +1,197 @@
+import asyncio
+import concurrent.futures
+import multiprocessing
+import time
+
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import Callable
+from workers.extraction_worker import extract_info
+from .music_exceptions import ExtractionQueueFull
+
+
+@dataclass(slots=True, kw_only=True, repr=True)
+class SchedulerMetrics:
+    queued: int = 0
+    completed: int = 0
+    failed: int = 0
+    rejected: int = 0
+    depth: int = 0
+    max_depth: int = 0
+    total_wait: float = 0.0
+    max_wait: float = 0.0
+
+    @property
+    def average_wait(self) -> float:
+        """
+        Returns the average number of seconds extractions spent queued.
+        """
+        started = self.completed + self.failed
+        return self.total_wait / started if started else 0.0
+
+
+class ExtractionScheduler:
+    """
+    Runs youtube_dl extractions in a dedicated process pool, so they don't hold the
+    event loop's GIL or tie up the default thread executor.
+
+    Each guild has its own queue, and workers take one extraction from each guild in
+    turn, so a guild queueing lots of songs can't starve the others. Extractions are
+    rejected with ExtractionQueueFull once a guild, or the scheduler as a whole, has
+    too many waiting.
+    """
+
+    def __init__(
+        self,
+        *,
+        max_workers: int = 2,
+        max_pending: int = 100,
+        max_pending_per_guild: int = 10,
+    ):
+        self.max_workers = max_workers
+        self.max_pending = max_pending
+        self.max_pending_per_guild = max_pending_per_guild
+        self.metrics = SchedulerMetrics()
+
+        self._executor: concurrent.futures.ProcessPoolExecutor = None
+        self._queues: OrderedDict[int, deque] = OrderedDict()
+        self._running: set[asyncio.Future] = set()
+        self._workers = 0
+
+    async def run(
+        self,
+        guild_id: int,
+        query: str,
+        *,
+        extract: Callable[[str], dict] = extract_info,
+    ) -> dict:
+        """
+        Queues an extraction for a guild and returns its result. extract is the
+        worker function that's run, which must be importable by worker processes.
+        """
+        jobs = self._queues.get(guild_id, ())
+
+        if (
+            self.metrics.depth >= self.max_pending
+            or len(jobs) >= self.max_pending_per_guild
+        ):
+            self.metrics.rejected += 1
+            raise ExtractionQueueFull()
+
+        future = asyncio.get_running_loop().create_future()
+        self._queues.setdefault(guild_id, deque()).append(
+            (extract, query, future, time.monotonic())
+        )
+
+        self.metrics.queued += 1
+        self.metrics.depth += 1
+        self.metrics.max_depth = max(self.metrics.max_depth, self.metrics.depth)
+
+        if self._workers < self.max_workers:
+            self._workers += 1
+            asyncio.create_task(self._work())
+
+        return await future
+
+    def close(self) -> None:
+        """
+        Shuts down the worker processes, cancelling every queued and running
+        extraction. The scheduler can still be used afterwards, and starts new
+        worker processes when it is.
+        """
+        for jobs in self._queues.values():
+            for _, _, future, _ in jobs:
+                future.cancel()
+
+        self.metrics.depth -= sum(map(len, self._queues.values()))
+        self._queues.clear()
+
+        for future in self._running:
+            future.cancel()
+
+        self._running.clear()
+
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+
+    def _get_executor(self) -> concurrent.futures.ProcessPoolExecutor:
+        """
+        Returns the process pool, starting it if needed.
+        """
+        if self._executor is None:
+            # Spawn rather than fork, so workers don't inherit the bot's event loop
+            # and open sockets
+            self._executor = concurrent.futures.ProcessPoolExecutor(
+                max_workers=self.max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+
+        return self._executor
+
+    async def _work(self) -> None:
+        """
+        Runs queued extractions, taking turns between guilds, until none are left.
+        """
+        loop = asyncio.get_running_loop()
+
+        try:
+            while self._queues:
+                guild_id, jobs = next(iter(self._queues.items()))
+                extract, query, future, queued_at = jobs.popleft()
+
+                if jobs:  # Send the guild to the back of the line
+                    self._queues.move_to_end(guild_id)
+                else:
+                    del self._queues[guild_id]
+
+                self.metrics.depth -= 1
+
+                if future.cancelled():
+                    continue
+
+                wait = time.monotonic() - queued_at
+                self.metrics.total_wait += wait
+                self.metrics.max_wait = max(self.metrics.max_wait, wait)
+
+                self._running.add(future)
+
+                try:
+                    executor = self._get_executor()
+                    data = await loop.run_in_executor(executor, extract, query)
+                except concurrent.futures.process.BrokenProcessPool as error:
+                    self._executor = None  # Start a new pool for the next one
+                    self._finish(future, error=error)
+                except asyncio.CancelledError:
+                    # Either close() cancelled the extraction, and this worker carries
+                    # on with anything queued since, or this worker was cancelled
+                    if not future.cancelled():
+                        future.cancel()
+                        raise
+                except Exception as error:
+                    self._finish(future, error=error)
+                else:
+                    self._finish(future, data=data)
+                finally:
+                    self._running.discard(future)
+        finally:
+            self._workers -= 1
+
+    def _finish(
+        self, future: asyncio.Future, *, data: dict = None, error: Exception = None
+    ) -> None:
+        """
+        Hands an extraction's result to whoever is waiting for it.
+        """
+        if error is None:
+            self.metrics.completed += 1
+        else:
+            self.metrics.failed += 1
+
+        if future.done():  # The caller stopped waiting
+            return
+
+        if error is None:
+            future.set_result(data)
+        else:
+            future.set_exception(error)
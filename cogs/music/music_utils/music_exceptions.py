@@ -11,3 +11,9 @@ class InvalidVC(VCError):
     """
     Exception class for invalid VCs.
     """
+
+
+class ExtractionQueueFull(commands.CommandError):
+    """
+    Exception class for songs that can't be queued for extraction right now.
+    """
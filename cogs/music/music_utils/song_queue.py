@@ -0,0 +1,133 @@
+import asyncio
+import itertools
+import random
+
+from async_timeout import timeout as timeout_after
+from collections import deque
+from typing import Any, Iterator
+
+
+class SongQueue:
+    """
+    A guild's queue of songs, backed by a deque so songs are added to the back and
+    taken from the front in O(1).
+
+    Unlike asyncio.Queue, songs can be looked at, removed and moved by their
+    position, which starts at 0 for the next song, and the queue can be shuffled.
+    The total length of the queued songs is kept up to date as they're added and
+    removed. Songs whose length isn't known, like live streams, count as 0.
+    """
+
+    def __init__(self):
+        self.duration = 0
+
+        self._songs: deque = deque()
+        self._added = asyncio.Event()
+
+    def __len__(self) -> int:
+        return len(self._songs)
+
+    def __iter__(self) -> Iterator[Any]:
+        return iter(self._songs)
+
+    def __getitem__(self, index: int) -> Any:
+        return self._songs[index]
+
+    @staticmethod
+    def song_duration(song) -> int:
+        """
+        Returns a song's length in seconds, or 0 if it isn't known.
+        """
+        if isinstance(song, dict):
+            return song.get("duration") or 0
+
+        return getattr(song, "duration", None) or 0
+
+    def empty(self) -> bool:
+        return not self._songs
+
+    def peek(self) -> Any:
+        """
+        Returns the next song without taking it, or None if the queue is empty.
+        """
+        return self._songs[0] if self._songs else None
+
+    def put(self, song) -> int:
+        """
+        Adds a song to the back of the queue and returns its position.
+        """
+        self._songs.append(song)
+        self.duration += self.song_duration(song)
+        self._added.set()
+
+        return len(self._songs) - 1
+
+    async def get(self, *, timeout: float = None) -> Any:
+        """
+        Takes the next song, waiting for one to be added if the queue is empty.
+        Raises asyncio.TimeoutError if none is added within timeout seconds.
+        """
+        async with timeout_after(timeout):
+            while not self._songs:
+                self._added.clear()
+                await self._added.wait()
+
+        return self._pop(0)
+
+    def remove(self, index: int) -> Any:
+        """
+        Removes the song at a position and returns it. Raises IndexError if there
+        isn't one.
+        """
+        if not -len(self._songs) <= index < len(self._songs):
+            raise IndexError("queue index out of range")
+
+        return self._pop(index)
+
+    def move(self, index: int, to: int) -> Any:
+        """
+        Moves the song at a position to another one and returns it. Raises
+        IndexError if either position is out of range.
+        """
+        if not 0 <= to < len(self._songs):
+            raise IndexError("queue index out of range")
+
+        song = self.remove(index)
+        self._songs.insert(to, song)
+        self.duration += self.song_duration(song)
+
+        return song
+
+    def shuffle(self) -> None:
+        """
+        Shuffles the queued songs.
+        """
+        random.shuffle(self._songs)
+
+    def clear(self) -> None:
+        """
+        Removes every queued song.
+        """
+        self._songs.clear()
+        self.duration = 0
+
+    def page(self, page: int, per_page: int) -> list:
+        """
+        Returns the songs on a page of the queue, counting pages from 0.
+        """
+        start = page * per_page
+        return list(itertools.islice(self._songs, start, start + per_page))
+
+    def _pop(self, index: int) -> Any:
+        """
+        Removes and returns a song, keeping the total length up to date.
+        """
+        if index == 0:
+            song = self._songs.popleft()
+        else:
+            song = self._songs[index]
+            del self._songs[index]
+
+        self.duration -= self.song_duration(song)
+
+        return song
@@ -1,25 +1,46 @@
 import discord
 import asyncio
+import time
 
 from youtube_dl import YoutubeDL
 from functools import partial
 from discord.ext import commands
-from ._music_utils_config import ytdl_options
+from urllib import parse
+from workers.extraction_worker import extract_playlist
+from ._music_utils_config import ffmpeg_options, ytdl_options
+from .audio_cache import AudioDiskCache
+from .extraction_cache import ExtractionCache
+from .extraction_scheduler import ExtractionScheduler
+from .ytdl_opus_source import YTDLOpusSource
 
 ytdl = YoutubeDL(ytdl_options)
 
+# Signed stream URLs say when they expire. Treat them as stale a little early, and
+# assume URLs that don't say last this long
+STREAM_EXPIRY_MARGIN = 60
+DEFAULT_STREAM_TTL = 1800
+
+# Shared by every guild, so popular songs are only extracted once
+extraction_cache = ExtractionCache()
+extraction_scheduler = ExtractionScheduler()
+audio_cache = AudioDiskCache()
+
 
 class YTDLSource(discord.PCMVolumeTransformer):
     """
     Contains functionality/data relating to the YouTube download source.
     """
 
+    # Whether streams are played as Opus from FFmpeg instead of PCM
+    opus_passthrough = True
+
     def __init__(self, source, *, data, requester):
         super().__init__(source)
 
         self.requester = requester
         self.title = data.get("title")
         self.web_url = data.get("webpage_url")
+        self.duration = data.get("duration")
 
     def __getitem__(self, item: str):
         return self.__getattribute__(item)
@@ -38,8 +59,12 @@ class YTDLSource(discord.PCMVolumeTransformer):
         """
         loop = loop or asyncio.get_event_loop()
 
-        to_run = partial(ytdl.extract_info, url=search, download=download)
-        data = await loop.run_in_executor(None, to_run)
+        if download:
+            to_run = partial(ytdl.extract_info, url=search, download=download)
+            data = await loop.run_in_executor(None, to_run)
+        else:  # Only the metadata is needed until the song is about to play
+            extract = partial(cls._extract, guild_id=ctx.guild.id)
+            data = await extraction_cache.get(search, extract, stream=False)
 
         if "entries" in data:  # Get the first item in a playlist
             data = data["entries"][0]
@@ -57,19 +82,131 @@ class YTDLSource(discord.PCMVolumeTransformer):
                 "webpage_url": data["webpage_url"],
                 "requester": ctx.author,
                 "title": data["title"],
+                "duration": data.get("duration"),
             }
 
         return cls(discord.FFmpegPCMAudio(source), data=data, requester=ctx.author)
 
+    @staticmethod
+    def is_playlist(search: str) -> bool:
+        """
+        Returns whether a search is a link to a playlist, rather than to a song that
+        happens to be in one.
+        """
+        url = parse.urlparse(search.strip())
+
+        if not url.scheme:
+            return False
+
+        query = parse.parse_qs(url.query)
+
+        if "list" in query:  # YouTube plays the video when there is one
+            return "v" not in query
+
+        return "playlist" in url.path or "/sets/" in url.path  # SoundCloud sets
+
     @classmethod
-    async def regather_stream(cls, data: dict, *, loop: asyncio.AbstractEventLoop):
+    async def create_playlist(cls, ctx: commands.Context, url: str) -> list[dict]:
         """
-        Used to prepare a stream instead of downloading.
+        Creates queue entries for every song in a playlist. Only their metadata is
+        listed, in a single request, and each song's stream is resolved when it's
+        about to play.
         """
-        loop = loop or asyncio.get_event_loop()
-        requester = data["requester"]
+        data = await extraction_scheduler.run(
+            ctx.guild.id, url, extract=extract_playlist
+        )
+        entries = [
+            {
+                "webpage_url": entry["webpage_url"],
+                "requester": ctx.author,
+                "title": entry["title"],
+                "duration": entry["duration"],
+            }
+            for entry in data["entries"]
+        ]
+
+        embed = discord.Embed(
+            title=f"🎧 Added {len(entries)} Songs to the Queue",
+            description=f'🎹 {data["title"] or url}',
+        )
+
+        await ctx.send(embed=embed)
+
+        return entries
+
+    @staticmethod
+    def stream_expiry(url: str, resolved_at: float) -> float:
+        """
+        Returns the time a stream URL stops working, minus a safety margin.
+        """
+        expire = parse.parse_qs(parse.urlparse(url).query).get("expire")
+
+        try:
+            expires_at = float(expire[0])
+        except (TypeError, ValueError):
+            expires_at = resolved_at + DEFAULT_STREAM_TTL
 
-        to_run = partial(ytdl.extract_info, url=data["webpage_url"], download=False)
-        data = await loop.run_in_executor(None, to_run)
+        return expires_at - STREAM_EXPIRY_MARGIN
 
-        return cls(discord.FFmpegPCMAudio(data["url"]), data=data, requester=requester)
+    @classmethod
+    async def resolve_stream(
+        cls, data: dict, *, loop: asyncio.AbstractEventLoop
+    ) -> dict:
+        """
+        Extracts a fresh stream URL for a queued song, without creating its source.
+        The returned data says when the URL expires under "expires_at".
+        """
+        extract = partial(cls._extract, guild_id=data["requester"].guild.id)
+        return await extraction_cache.get(data["webpage_url"], extract)
+
+    @classmethod
+    async def _extract(cls, query: str, *, guild_id: int) -> dict:
+        """
+        Extracts the metadata and stream URL for a search or URL in the extraction
+        process pool, taking turns with other guilds.
+        """
+        data = await extraction_scheduler.run(guild_id, query)
+        data["expires_at"] = cls.stream_expiry(data["url"], time.time())
+        return data
+
+    @classmethod
+    def from_stream(cls, data: dict, *, requester, volume: float = 1.0):
+        """
+        Creates a source from data returned by resolve_stream.
+        """
+        if cls.opus_passthrough:
+            return YTDLOpusSource(data, requester=requester, volume=volume)
+
+        source = cls(
+            discord.FFmpegPCMAudio(data["url"], **ffmpeg_options),
+            data=data,
+            requester=requester,
+        )
+        source.volume = volume
+
+        return source
+
+    @classmethod
+    def from_file(cls, entry: dict, path: str, acodec: str, *, volume: float = 1.0):
+        """
+        Creates a source for a queued song from its file in the audio cache.
+        """
+        data = {
+            "title": entry["title"],
+            "webpage_url": entry["webpage_url"],
+            "url": path,
+            "acodec": acodec,
+            "expires_at": float("inf"),  # Local files don't expire
+        }
+
+        return cls.from_stream(data, requester=entry["requester"], volume=volume)
+
+    @classmethod
+    async def regather_stream(
+        cls, data: dict, *, loop: asyncio.AbstractEventLoop, volume: float = 1.0
+    ):
+        """
+        Used to prepare a stream instead of downloading.
+        """
+        resolved = await cls.resolve_stream(data, loop=loop)
+        return cls.from_stream(resolved, requester=data["requester"], volume=volume)
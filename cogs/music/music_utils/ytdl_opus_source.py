@@ -0,0 +1,75 @@
+import discord
+
+from ._music_utils_config import ffmpeg_options
+
+# Each packet FFmpegOpusAudio reads is 20ms of audio
+FRAME_LENGTH = 0.02
+
+
+class YTDLOpusSource(discord.FFmpegOpusAudio):
+    """
+    Plays a stream as Opus straight from FFmpeg, so nothing is decoded, volume
+    scaled or encoded in the bot's process.
+
+    Opus streams are copied without transcoding when the volume is 100%. Otherwise
+    FFmpeg applies the volume with a filter and encodes the result itself. FFmpeg's
+    volume can't be changed while it runs, so with_volume restarts the stream from
+    the current position instead.
+    """
+
+    def __init__(
+        self,
+        data: dict,
+        *,
+        requester,
+        volume: float = 1.0,
+        position: float = 0.0,
+    ):
+        self.data = data
+        self.requester = requester
+        self.title = data.get("title")
+        self.web_url = data.get("webpage_url")
+        self.volume = volume
+        self.position = position
+
+        before_options = ffmpeg_options["before_options"]
+        options = ffmpeg_options["options"]
+
+        if position:
+            before_options += f" -ss {position:.2f}"
+
+        passthrough = volume == 1.0 and data.get("acodec") == "opus"
+
+        if not passthrough:
+            options += f" -filter:a volume={volume:.2f}"
+
+        # FFmpegOpusAudio copies the stream when told it's already Opus, and encodes
+        # it with libopus otherwise
+        super().__init__(
+            data["url"],
+            codec="opus" if passthrough else None,
+            before_options=before_options,
+            options=options,
+        )
+
+    def __getitem__(self, item: str):
+        return self.__getattribute__(item)
+
+    def read(self) -> bytes:
+        """
+        Reads the next packet, keeping track of how far into the stream it is.
+        """
+        packet = super().read()
+
+        if packet:
+            self.position += FRAME_LENGTH
+
+        return packet
+
+    def with_volume(self, volume: float) -> "YTDLOpusSource":
+        """
+        Returns a new source that continues this one's stream at another volume.
+        """
+        return type(self)(
+            self.data, requester=self.requester, volume=volume, position=self.position
+        )
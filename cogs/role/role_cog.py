@@ -2,11 +2,18 @@
 Contains a cog that handles reaction roles/self roles.
 """
 
+import asyncio
 import discord
-import json
 
 from client import Client
 from discord.ext import commands
+from typing import Optional
+from utils import ReactionRoleIndex
+
+# Discord allows at most 20 different reactions on a message
+MAX_MENU_ROLES = 20
+# How many reaction role messages removereactrole deletes at once
+DELETE_CONCURRENCY = 5
 
 
 class RoleCog(commands.Cog, name="Roles"):
@@ -16,7 +23,6 @@ class RoleCog(commands.Cog, name="Roles"):
 
     def __init__(self, client: Client):
         self.client = client
-        self.reactionroles_database_filepath = client.database_paths["reactionroles"]
 
     @commands.command(aliases=["crr"])
     @commands.has_permissions(manage_roles=True)
@@ -37,17 +43,84 @@ class RoleCog(commands.Cog, name="Roles"):
         await msg.add_reaction(emoji)
 
         database = self.client.cache.reactionroles
-        database.append(
+        database.add(
             {
                 "guild_id": ctx.guild.id,
                 "name": role.name,
                 "role_id": role.id,
                 "emoji": emoji,
                 "msg_id": msg.id,
+                "channel_id": msg.channel.id,
             }
         )
 
-        self.client.update_json(self.reactionroles_database_filepath, database)
+        self.client.cache.mark_dirty("reactionroles", msg.id)
+
+    @commands.command(aliases=["crm"])
+    @commands.has_permissions(manage_roles=True)
+    async def reactmenu(self, ctx: commands.Context, message: str, *pairs: str):
+        """
+        🏷️ Creates a reaction role menu, with a different role for each emoji on a
+        single message.
+
+        Usage:
+        ```
+        ~reactmenu | ~crm "<message>" <emoji> <@role> [<emoji> <@role> ...]
+        ```
+        """
+        if not pairs or len(pairs) % 2 or len(pairs) // 2 > MAX_MENU_ROLES:
+            raise commands.BadArgument(
+                f"Menus need between 1 and {MAX_MENU_ROLES} emoji and role pairs."
+            )
+
+        converter = commands.RoleConverter()
+        menu = [
+            (emoji, await converter.convert(ctx, role))
+            for emoji, role in zip(pairs[::2], pairs[1::2])
+        ]
+
+        keys = [ReactionRoleIndex.emoji_key(emoji) for emoji, _ in menu]
+
+        if len(set(keys)) != len(keys):
+            raise commands.BadArgument("Each emoji can only be used once in a menu.")
+
+        lines = "\n".join(f"{emoji} {role.mention}" for emoji, role in menu)
+        embed = discord.Embed(description=f"{message}\n\n{lines}")
+        msg = await ctx.channel.send(embed=embed)
+
+        # Store the whole menu first, so reactions added straight away count
+        database = self.client.cache.reactionroles
+
+        for emoji, role in menu:
+            database.add(
+                {
+                    "guild_id": ctx.guild.id,
+                    "name": role.name,
+                    "role_id": role.id,
+                    "emoji": emoji,
+                    "msg_id": msg.id,
+                    "channel_id": msg.channel.id,
+                }
+            )
+
+        self.client.cache.mark_dirty("reactionroles", msg.id)
+        failed = []
+
+        # Reactions on a message share a rate limit that discord.py paces for us,
+        # and are shown in the order they're added, so add them one at a time
+        for (emoji, _), key in zip(menu, keys):
+            try:
+                await msg.add_reaction(emoji)
+            except discord.HTTPException:
+                failed.append(emoji)
+                database.remove(msg.id, key)
+
+        if failed:
+            self.client.cache.mark_dirty("reactionroles", msg.id)
+            await ctx.reply(
+                f"❌ Sorry, {' '.join(failed)} couldn't be added to the menu.",
+                delete_after=20,
+            )
 
     @commands.command(aliases=["rrr"])
     @commands.has_permissions(manage_roles=True)
@@ -60,19 +133,73 @@ class RoleCog(commands.Cog, name="Roles"):
         ~removereactrole | ~rrr <@role>
         ```
         """
-
         data = self.client.cache.reactionroles
-        instances = [item for item in data if item["role_id"] == role.id]
+        instances = data.for_role(role.id)
+
         if len(instances) == 0:
             raise commands.RoleNotFound(role.__str__())
-        for instance in instances:
-            msg = ctx.channel.get_partial_message(instance["msg_id"])
-            await msg.delete()
-            data.remove(instance)
-        self.client.update_json(self.reactionroles_database_filepath, data)
-        embed = discord.Embed(title="👍🏻 Done.", description=f"🔧 Removed '{role.name}'.")
+
+        # Remove every entry before deleting anything, so it's written in one flush
+        removed = [data.remove(item["msg_id"], item["emoji"]) for item in instances]
+        channels = {item["msg_id"]: item.get("channel_id") for item in removed}
+        self.client.cache.mark_dirty("reactionroles", *channels)
+
+        # Menus keep their message as long as they have other roles on them
+        semaphore = asyncio.Semaphore(DELETE_CONCURRENCY)
+        failed = await asyncio.gather(
+            *(
+                self._delete_message(ctx, msg_id, channel_id, semaphore)
+                for msg_id, channel_id in channels.items()
+                if msg_id not in data
+            )
+        )
+
+        embed = discord.Embed(
+            title="👍🏻 Done.", description=f"🔧 Removed '{role.name}'."
+        )
         await ctx.send(embed=embed)
 
+        failed = [message.jump_url for message in failed if message is not None]
+
+        if failed:
+            await ctx.reply(
+                "❌ Sorry, these messages couldn't be deleted, so please delete them "
+                + "yourself:\n"
+                + "\n".join(failed)
+            )
+
+    async def _delete_message(
+        self,
+        ctx: commands.Context,
+        msg_id: int,
+        channel_id: int,
+        semaphore: asyncio.Semaphore,
+    ) -> Optional[discord.PartialMessage]:
+        """
+        Deletes a reaction role message from the channel it was sent in, and returns
+        it if it couldn't be. Entries created before channels were stored are
+        assumed to be in this channel.
+        """
+        if channel_id is None:
+            channel = ctx.channel
+        else:
+            channel = ctx.guild.get_channel_or_thread(channel_id)
+
+        if channel is None:  # The channel has been deleted
+            return None
+
+        message = channel.get_partial_message(msg_id)
+
+        async with semaphore:
+            try:
+                await message.delete()
+            except discord.NotFound:  # Someone else deleted it first
+                pass
+            except discord.HTTPException:  # Missing permissions, etc.
+                return message
+
+        return None
+
     @commands.command(alias=["roles"])
     async def viewreactroles(self, ctx: commands.Context):
         """
@@ -86,10 +213,7 @@ class RoleCog(commands.Cog, name="Roles"):
         roles = []
         db = self.client.cache.reactionroles
 
-        for reaction_role_message in db:
-            if reaction_role_message["guild_id"] != ctx.guild.id:
-                continue
-
+        for reaction_role_message in db.for_guild(ctx.guild.id):
             role_id = int(reaction_role_message["role_id"])
             role = ctx.guild.get_role(role_id)
 
@@ -137,6 +261,28 @@ class RoleCog(commands.Cog, name="Roles"):
 
         await ctx.reply(message, delete_after=20)
 
+    @reactmenu.error
+    async def reactmenu_error(self, ctx: commands.Context, error):
+        """
+        Error handler for the reactmenu command.
+        """
+        error = getattr(error, "original", error)
+        message = f"❌ "
+
+        if isinstance(error, commands.RoleNotFound):
+            message += "The role you specified was not found."
+
+        elif isinstance(error, commands.MissingRequiredArgument):
+            message += "Please enter all the required arguments."
+
+        elif isinstance(error, commands.BadArgument):
+            message += str(error)
+
+        elif isinstance(error, commands.UserInputError):
+            message += "Invalid input, please try again."
+
+        await ctx.reply(message, delete_after=20)
+
     @removereactrole.error
     async def removereactrole_error(self, ctx: commands.Context, error):
         """
@@ -7,6 +7,16 @@ import asyncio
 
 from client import Client
 from discord.ext import commands
+from typing import Optional
+from utils import (
+    DeletionQueue,
+    GuildFeature,
+    PollUpdater,
+    ReactionRoleIndex,
+    RoleUpdateQueue,
+    SpamDetector,
+    poll_embed,
+)
 
 
 class EventHandler(commands.Cog):
@@ -16,42 +26,41 @@ class EventHandler(commands.Cog):
 
     def __init__(self, client: Client) -> None:
         self.client = client
-        self.reactionroles_database_filepath = client.database_paths["reactionroles"]
+        self.deletion_queue = DeletionQueue()
+        self.spam_detector = SpamDetector()
+        self.poll_updater = PollUpdater(self._render_poll)
+        self.role_queue = RoleUpdateQueue()
 
     async def _add_or_remove_role(
         self, payload: discord.RawReactionActionEvent, client: commands.Bot, type: str
     ):
         """
-        Adds or removes a role from a user.
+        Queues a role to be added to or removed from a user. Changes made in quick
+        succession, such as clicking through a menu of reaction roles, are applied
+        together in one request.
         """
+        entry = self.client.cache.reactionroles.get(
+            payload.message_id, ReactionRoleIndex.emoji_key(payload.emoji)
+        )
+
+        if entry is None:
+            return
+
         guild: discord.Guild = client.get_guild(payload.guild_id)
 
         if type == "add":
             member = payload.member
-            action = member.add_roles
 
         if type == "remove":
             member: discord.Member = guild.get_member(payload.user_id)
-            action = member.remove_roles
 
-        if member.bot:
+        if member is None or member.bot:
             return
 
-        data = self.client.cache.reactionroles
-        roles = guild.roles
-
-        for item in data:
-            # Check if the reaction emoji and message are the ones used to give a user
-            # a specific role, or if the role has been deleted
-            if (
-                item["emoji"] != payload.emoji.name
-                or item["msg_id"] != payload.message_id
-                or item["role_id"] not in [role.id for role in guild.roles]
-            ):
-                continue
-            # If not, either add/remove the role
-            role = discord.utils.get(roles, id=item["role_id"])
-            await action(role)
+        if guild.get_role(entry["role_id"]) is None:  # The role has been deleted
+            return
+
+        self.role_queue.schedule(member, entry["role_id"], type == "add")
 
     @commands.Cog.listener()
     async def on_member_join(self, member: discord.Member):
@@ -81,48 +90,136 @@ class EventHandler(commands.Cog):
         if not message.guild or message.author.bot:
             return
 
-        blacklist = self.client.cache.blacklist
+        features = self.client.cache.guild_features.get(message.guild.id)
 
-        if (
-            self.client.command_prefix(self.client, message) in message.content
-            or (id := str(message.guild.id)) not in blacklist
-        ):
+        if not features:  # The server doesn't have any filters enabled
             return
-        for wordlist in (
-            words_msg := set(
-                msg.lower() for msg in message.content.split(" ")
-            ),  # Words in the message
-            words_ban := set(blacklist.get(id)),  # Words blacklisted in the server
-        ):
-            wordlist = {word.strip().lower() for word in wordlist}
 
-        if words_msg & words_ban:  # If any banned words are in the message
-            await message.delete()
+        if message.content.startswith(self.client.command_prefix(self.client, message)):
+            return
+
+        if features & GuildFeature.BLACKLIST:
+            matcher = self.client.cache.blacklist_matcher(str(message.guild.id))
+
+            if matcher.matches(message.content):  # If any banned words are in it
+                return self.deletion_queue.schedule(message.channel, message.id)
+
+        if features & GuildFeature.ANTISPAM:
+            settings = self.client.cache.antispam[str(message.guild.id)]
+            spam = self.spam_detector.check(
+                message.guild.id,
+                message.channel.id,
+                message.author.id,
+                message.id,
+                message.content,
+                **settings,
+            )
+
+            for channel_id, message_id in spam:
+                channel = message.guild.get_channel_or_thread(channel_id)
+
+                if channel is not None:
+                    self.deletion_queue.schedule(channel, message_id)
 
     @commands.Cog.listener()
-    async def on_reaction_add(self, reaction: discord.Reaction, user: discord.User):
+    async def on_raw_message_edit(self, payload: discord.RawMessageUpdateEvent):
         """
-        Prevents users from voting more than once on a poll.
+        Called when a message is edited, so users can't get around the blacklist by
+        editing a message after sending it.
         """
-        if user.bot:
+        features = self.client.cache.guild_features.get(
+            payload.guild_id, GuildFeature.NONE
+        )
+
+        if not features & GuildFeature.BLACKLIST or "content" not in payload.data:
             return
 
-        message: discord.Message = discord.utils.find(
-            lambda cached_message: reaction.message == cached_message,
-            self.client.cached_messages,
-        )
+        if payload.data.get("author", {}).get("bot"):
+            return
+
+        before = payload.cached_message
+        content = payload.data["content"]
+
+        if content.startswith(self.client.command_prefix(self.client, before)):
+            return
 
-        for existing_reaction in message.reactions:
-            users = {user async for user in existing_reaction.users()}
+        matcher = self.client.cache.blacklist_matcher(str(payload.guild_id))
 
-            if user in users and str(existing_reaction) != str(reaction):
-                await message.remove_reaction(existing_reaction.emoji, user)
+        # Only re-check the words that changed if we know what the message said before
+        if before is None:
+            blacklisted = matcher.matches(content)
+        else:
+            blacklisted = matcher.matches_edit(before.content, content)
+
+        if blacklisted:
+            channel = self.client.get_channel(payload.channel_id)
+
+            if channel is None:  # Not cached
+                return
+
+            self.deletion_queue.schedule(channel, payload.message_id)
+
+    def _render_poll(self, message_id: int) -> Optional[discord.Embed]:
+        """
+        Creates an embed with a poll's current results, if it's still open.
+        """
+        polls = self.client.cache.polls
+        entry = polls.get(message_id)
+
+        if entry is None:
+            return None
+
+        return poll_embed(entry, polls.tally(message_id))
+
+    def _update_poll(self, payload: discord.RawReactionActionEvent):
+        """
+        Saves a change to a poll's votes and queues an edit to show its results.
+        """
+        channel = self.client.get_channel(payload.channel_id)
+
+        self.client.cache.mark_dirty("polls", payload.message_id)
+        self.poll_updater.schedule(channel, payload.message_id)
+
+    async def _add_vote(self, payload: discord.RawReactionActionEvent):
+        """
+        Counts a vote on a poll, and prevents users from voting more than once by
+        removing the reaction for their previous choice.
+        """
+        polls = self.client.cache.polls
+        emoji = str(payload.emoji)
+
+        if payload.user_id == self.client.user.id:
+            return
+
+        if not polls.is_option(payload.message_id, emoji):
+            return
+
+        previous = polls.vote(payload.message_id, payload.user_id, emoji)
+        self._update_poll(payload)
+
+        if previous is None:
+            return
+
+        channel = self.client.get_channel(payload.channel_id)
+
+        if channel is None:  # Not cached
+            return
+
+        message = channel.get_partial_message(payload.message_id)
+
+        # The vote has been counted either way, so a failure here shouldn't stop the
+        # reaction role handler from running
+        try:
+            await message.remove_reaction(previous, discord.Object(id=payload.user_id))
+        except discord.HTTPException:
+            pass
 
     @commands.Cog.listener()
     async def on_raw_reaction_add(self, payload: discord.RawReactionActionEvent):
         """
         Runs when a reaction is added, regardless of the internal message cache.
         """
+        await self._add_vote(payload)
         await self._add_or_remove_role(payload, self.client, "add")
 
     @commands.Cog.listener()
@@ -130,21 +227,86 @@ class EventHandler(commands.Cog):
         """
         Runs when a reaction is added, regardless of the internal message cache.
         """
+        polls = self.client.cache.polls
+
+        if polls.unvote(payload.message_id, payload.user_id, str(payload.emoji)):
+            self._update_poll(payload)
+
         await self._add_or_remove_role(payload, self.client, "remove")
 
+    def _remove_reaction_roles(self, removed: list[dict]):
+        """
+        Marks the messages of removed reaction roles as modified, if there are any.
+        """
+        if removed:
+            self.client.cache.mark_dirty(
+                "reactionroles", *{item["msg_id"] for item in removed}
+            )
+
+    def _remove_polls(self, removed: list[Optional[dict]]):
+        """
+        Marks removed polls as modified and drops their pending edits, if there are
+        any.
+        """
+        msg_ids = [entry["msg_id"] for entry in removed if entry is not None]
+
+        for msg_id in msg_ids:
+            self.poll_updater.cancel(msg_id)
+
+        if msg_ids:
+            self.client.cache.mark_dirty("polls", *msg_ids)
+
+    @commands.Cog.listener()
+    async def on_raw_message_delete(self, payload: discord.RawMessageDeleteEvent):
+        """
+        Removes the reaction roles and poll for a deleted message, regardless of the
+        internal message cache.
+        """
+        data = self.client.cache.reactionroles
+        self._remove_polls([self.client.cache.polls.remove(payload.message_id)])
+
+        if payload.message_id in data:  # Most deleted messages aren't reaction roles
+            self._remove_reaction_roles(data.remove_message(payload.message_id))
+
     @commands.Cog.listener()
-    async def on_message_delete(self, message: discord.Message):
+    async def on_raw_bulk_message_delete(
+        self, payload: discord.RawBulkMessageDeleteEvent
+    ):
         """
-        Deletes reaction role messages that correspond to a deleted role. Removes the
-        entry for that reaction role in the JSON file.
+        Removes the reaction roles and polls for messages deleted in bulk, such as by
+        ~clear, as a single change.
         """
-        reaction_roles = self.client.cache.reactionroles
+        data = self.client.cache.reactionroles
+        polls = self.client.cache.polls
+
+        self._remove_polls([polls.remove(msg_id) for msg_id in payload.message_ids])
 
-        for reaction_role in reaction_roles:
-            if reaction_role["msg_id"] == message.id:
-                reaction_roles.remove(reaction_role)
+        removed = [
+            item
+            for msg_id in payload.message_ids
+            if msg_id in data
+            for item in data.remove_message(msg_id)
+        ]
 
-        self.client.update_json(self.reactionroles_database_filepath, reaction_roles)
+        self._remove_reaction_roles(removed)
+
+    @commands.Cog.listener()
+    async def on_guild_role_delete(self, role: discord.Role):
+        """
+        Removes the reaction roles for a deleted role.
+        """
+        data = self.client.cache.reactionroles
+        self._remove_reaction_roles(data.remove_role(role.id))
+
+    @commands.Cog.listener()
+    async def on_guild_remove(self, guild: discord.Guild):
+        """
+        Removes the reaction roles and polls for a guild the bot has left.
+        """
+        data = self.client.cache.reactionroles
+        self._remove_reaction_roles(data.remove_guild(guild.id))
+        self._remove_polls(self.client.cache.polls.remove_guild(guild.id))
+        self.spam_detector.forget(guild.id)
 
     @commands.Cog.listener()
     async def on_ready(self):
@@ -154,10 +316,14 @@ class EventHandler(commands.Cog):
         print(f"Loaded\nName: {self.client.user.name} // ID: {self.client.user.id}")
 
         task_handler = self.client.cogs.get("TaskHandler")
-        tasks = ["change_presence", "clean_json_file"]
+        tasks = ["change_presence", "close_polls"]
 
         for task in tasks:
-            task_handler.__getattribute__(task).start()
+            if not (loop := task_handler.__getattribute__(task)).is_running():
+                loop.start()
+
+        task_handler.reconcile_reaction_roles()
+        task_handler.reconcile_reactions()
 
 
 async def setup(client: commands.Bot):
@@ -1,8 +1,9 @@
-import threading
+import time
 import discord
 
 from client import Client
 from discord.ext import commands, tasks
+from utils import ReactionReconciler, poll_embed
 
 
 class TaskHandler(commands.Cog):
@@ -12,28 +13,80 @@ class TaskHandler(commands.Cog):
 
     def __init__(self, client: Client):
         self.client = client
-        self.reactionroles_database_filepath = client.database_paths["reactionroles"]
+        self.reconciled = False
+        self.reconciler: ReactionReconciler = None
+
+    def reconcile_reaction_roles(self):
+        """
+        Removes reaction roles for guilds and roles that were deleted while the bot
+        was offline. Changes made while online are handled by the event handler.
+        """
+        if self.reconciled:
+            return
 
-    def do_process(self):
         data = self.client.cache.reactionroles
+        removed = []
+
+        for guild_id in data.guild_ids():
+            guild = self.client.get_guild(guild_id)
 
-        for guild in self.client.guilds:
-            for item in list(filter(lambda item: item["guild_id"] == guild.id, data)):
-                if item["role_id"] not in [role.id for role in guild.roles]:
-                    data.remove(item)
+            if guild is None:
+                removed += data.remove_guild(guild_id)
+                continue
 
-        self.client.update_json(self.reactionroles_database_filepath, data)
+            if guild.unavailable:  # Its roles can't be trusted during an outage
+                continue
 
-    @tasks.loop(seconds=60)
-    async def clean_json_file(self):
+            for item in data.for_guild(guild_id):
+                if guild.get_role(item["role_id"]) is None:
+                    removed.append(data.remove(item["msg_id"], item["emoji"]))
+
+        if removed:
+            self.client.cache.mark_dirty(
+                "reactionroles", *{item["msg_id"] for item in removed}
+            )
+
+        self.reconciled = True
+
+    def reconcile_reactions(self):
         """
-        Automatically removes deleted roles from the JSON file containing reaction roles.
+        Starts giving out reaction roles for reactions that were added while the bot
+        was offline. Messages reconciled shortly before, by an earlier run or before a
+        restart, are skipped, so reconnects don't fetch them all again.
         """
-        cleanup_thread = threading.Thread(
-            target=self.do_process, name="Renove Unwanted", daemon=True
-        )
+        if self.reconciler is None:
+            role_queue = self.client.cogs.get("EventHandler").role_queue
+            self.reconciler = ReactionReconciler(self.client.cache, role_queue)
+
+        self.reconciler.start(self.client)
+
+    @tasks.loop(seconds=5)
+    async def close_polls(self):
+        """
+        Closes polls whose close time has passed, including any that passed while
+        the bot was offline, and shows their final results.
+        """
+        polls = self.client.cache.polls
+        poll_updater = self.client.cogs.get("EventHandler").poll_updater
+
+        for msg_id in polls.due(time.time()):
+            tally = polls.tally(msg_id)
+            entry = polls.remove(msg_id)
+
+            self.client.cache.mark_dirty("polls", msg_id)
+            poll_updater.cancel(msg_id)
+
+            channel = self.client.get_channel(entry["channel_id"])
+
+            if channel is None:  # The channel has been deleted
+                continue
 
-        cleanup_thread.start()
+            try:
+                await channel.get_partial_message(msg_id).edit(
+                    embed=poll_embed(entry, tally, closed=True)
+                )
+            except discord.HTTPException:  # The message has been deleted
+                pass
 
     @tasks.loop(seconds=30)
     async def change_presence(self):
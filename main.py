@@ -2,12 +2,8 @@ import asyncio
 import itertools
 import json
 import os
-import discord
 import dotenv
 
-from discord.ext import commands
-from client import Client, get_prefix
-
 dotenv.load_dotenv(".env")
 
 with open("config.json", "r") as file:
@@ -16,28 +12,47 @@ with open("config.json", "r") as file:
     EXTENSION_PATHS = config["extension_paths"]
     HANDLER_PATHS = config["handler_paths"]
     DATABASE_PATHS = config["database_paths"]
+    DATABASE_FLUSH_INTERVAL = config["database_flush_interval"]
+    BLACKLIST_LEETSPEAK = config["blacklist_leetspeak"]
+    MUSIC_EXTRACTION_WORKERS = config["music_extraction_workers"]
+    MUSIC_OPUS_PASSTHROUGH = config["music_opus_passthrough"]
+    MUSIC_CACHE_BYTES = config["music_cache_bytes"]
+    MUSIC_CACHE_MIN_PLAYS = config["music_cache_min_plays"]
 
 # Change TEST_GUILD_ID to your guild in ./.env if you're working on BB.Bot's development
 TEST_GUILD_ID = int(os.getenv("TEST_GUILD_ID"))
 
-intents = discord.Intents.all()
-status = itertools.cycle(["❓ ~help", "🎵 ~play", "📢 ~twitch"])
-client = Client(
-    status,
-    EXTENSION_PATHS,
-    HANDLER_PATHS,
-    DATABASE_PATHS,
-    TEST_GUILD_ID,
-    command_prefix=get_prefix,
-    intents=intents,
-    case_insensitive=True,
-)
 
 # Load the client, sync slash commands and start an aiohttp session
 async def main():
     """
     Entry point of the application.
     """
+    # Imported here, since spawned worker processes also run this file's top level
+    # and shouldn't import discord.py and the bot
+    import discord
+
+    from client import Client, get_prefix
+
+    intents = discord.Intents.all()
+    status = itertools.cycle(["❓ ~help", "🎵 ~play", "📢 ~twitch"])
+    client = Client(
+        status,
+        EXTENSION_PATHS,
+        HANDLER_PATHS,
+        DATABASE_PATHS,
+        TEST_GUILD_ID,
+        database_flush_interval=DATABASE_FLUSH_INTERVAL,
+        blacklist_leetspeak=BLACKLIST_LEETSPEAK,
+        music_extraction_workers=MUSIC_EXTRACTION_WORKERS,
+        music_opus_passthrough=MUSIC_OPUS_PASSTHROUGH,
+        music_cache_bytes=MUSIC_CACHE_BYTES,
+        music_cache_min_plays=MUSIC_CACHE_MIN_PLAYS,
+        command_prefix=get_prefix,
+        intents=intents,
+        case_insensitive=True,
+    )
+
     async with client:
         await client.load()
 
@@ -47,4 +62,7 @@ async def main():
         await client.start(TOKEN)
 
 
-asyncio.run(main())
+# Worker processes are spawned, so they import this file too. Only start the bot in
+# the main process
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,57 @@
+"""
+Benchmarks the blacklist filter used by EventHandler.on_message.
+
+Compares the old split-on-spaces check against the Tokenizer and BlacklistMatcher,
+and prints how many messages per second each can check.
+
+Run from the root directory with `python scripts/benchmark_blacklist.py`.
+"""
+
+import os
+import random
+import sys
+import timeit
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.models import BlacklistMatcher, Tokenizer
+
+BLACKLIST = [f"word{number}" for number in range(200)] + ["bad phrase", "very bad"]
+VOCABULARY = ["hello", "there", "General", "Kenobi!", "ｗｉｄｅ", "w0rd", "ok,"]
+MESSAGES = 10_000
+
+
+def split_path(content: str, blacklist: list[str]) -> bool:
+    """
+    The check on_message used before the tokenizer, kept here for comparison.
+    """
+    words_msg = set(msg.lower() for msg in content.split(" "))
+    words_ban = set(blacklist)
+
+    return bool(words_msg & words_ban)
+
+
+def main():
+    random.seed(0)
+    messages = [
+        " ".join(random.choices(VOCABULARY + BLACKLIST[:2], k=random.randint(3, 30)))
+        for _ in range(MESSAGES)
+    ]
+
+    checks = {
+        "split on spaces (old)": lambda message: split_path(message, BLACKLIST),
+        "tokenizer + matcher": BlacklistMatcher(BLACKLIST).matches,
+        "tokenizer + matcher, no leetspeak": BlacklistMatcher(
+            BLACKLIST, tokenizer=Tokenizer(leetspeak=False)
+        ).matches,
+    }
+
+    for name, check in checks.items():
+        seconds = min(
+            timeit.repeat(lambda: list(map(check, messages)), number=1, repeat=5)
+        )
+        print(f"{name:<36} {MESSAGES / seconds:>12,.0f} messages/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmarks the CPU cost of the playback paths used by MusicPlayer.
+
+Each path plays the same audio through several concurrent sources, each read on
+its own thread the way discord.py's AudioPlayer reads them:
+
+* PCM: FFmpegPCMAudio, volume scaled by PCMVolumeTransformer and encoded to Opus
+  in the bot's process.
+* Opus with volume: YTDLOpusSource, with FFmpeg applying the volume and encoding.
+* Opus passthrough: YTDLOpusSource at full volume, with FFmpeg copying the Opus
+  stream. Only run if the audio is already Opus.
+
+Prints the CPU time each path used per stream, in the bot's process and in FFmpeg.
+Needs FFmpeg and libopus.
+
+Run from the root directory with
+`python scripts/benchmark_playback.py <audio file or URL> [streams] [seconds]`.
+"""
+
+import asyncio
+import os
+import resource
+import sys
+import threading
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import discord
+
+from cogs.music.music_utils import YTDLOpusSource
+from cogs.music.music_utils._music_utils_config import ffmpeg_options
+
+FRAMES_PER_SECOND = 50
+
+
+def play_pcm(url: str, frames: int) -> None:
+    """
+    Reads and encodes frames the way discord.py does for a PCM source.
+    """
+    source = discord.PCMVolumeTransformer(
+        discord.FFmpegPCMAudio(url, **ffmpeg_options), volume=0.5
+    )
+    encoder = discord.opus.Encoder()
+
+    for _ in range(frames):
+        data = source.read()
+
+        if not data:
+            break
+
+        encoder.encode(data, encoder.SAMPLES_PER_FRAME)
+
+    source.cleanup()
+
+
+def play_opus(url: str, frames: int, *, volume: float, acodec: str) -> None:
+    """
+    Reads frames the way discord.py does for an Opus source, without encoding them.
+    """
+    data = {"url": url, "acodec": acodec}
+    source = YTDLOpusSource(data, requester=None, volume=volume)
+
+    for _ in range(frames):
+        if not source.read():
+            break
+
+    source.cleanup()
+
+
+def benchmark(play, streams: int) -> tuple[float, float, float]:
+    """
+    Plays several streams at once and returns the wall time, and the CPU time used
+    by this process and by FFmpeg, per stream.
+    """
+    before_self = resource.getrusage(resource.RUSAGE_SELF)
+    before_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+    started = time.perf_counter()
+
+    threads = [threading.Thread(target=play) for _ in range(streams)]
+
+    for thread in threads:
+        thread.start()
+
+    for thread in threads:
+        thread.join()
+
+    wall = time.perf_counter() - started
+    after_self = resource.getrusage(resource.RUSAGE_SELF)
+    after_children = resource.getrusage(resource.RUSAGE_CHILDREN)
+
+    cpu_self = (after_self.ru_utime + after_self.ru_stime) - (
+        before_self.ru_utime + before_self.ru_stime
+    )
+    cpu_children = (after_children.ru_utime + after_children.ru_stime) - (
+        before_children.ru_utime + before_children.ru_stime
+    )
+
+    return wall, cpu_self / streams, cpu_children / streams
+
+
+def main():
+    if len(sys.argv) < 2:
+        return print(__doc__)
+
+    url = sys.argv[1]
+    streams = int(sys.argv[2]) if len(sys.argv) > 2 else 8
+    seconds = int(sys.argv[3]) if len(sys.argv) > 3 else 60
+    frames = seconds * FRAMES_PER_SECOND
+
+    codec, _ = asyncio.run(discord.FFmpegOpusAudio.probe(url))
+
+    paths = {
+        "PCM (old)": lambda: play_pcm(url, frames),
+        "Opus with volume": lambda: play_opus(url, frames, volume=0.5, acodec=codec),
+    }
+
+    if codec == "opus":
+        paths["Opus passthrough"] = lambda: play_opus(
+            url, frames, volume=1.0, acodec=codec
+        )
+
+    print(f"{streams} streams of {seconds}s of {codec} audio\n")
+    print(f"{'':<20} {'wall':>8} {'bot CPU/stream':>16} {'FFmpeg CPU/stream':>18}")
+
+    for name, play in paths.items():
+        wall, cpu_self, cpu_children = benchmark(play, streams)
+        print(f"{name:<20} {wall:>7.2f}s {cpu_self:>15.3f}s {cpu_children:>17.3f}s")
+
+
+if __name__ == "__main__":
+    main()
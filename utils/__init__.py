@@ -3,4 +3,5 @@ from .modals import *
 from .selects import *
 from .views import *
 from .functions import *
-from .models import *
\ No newline at end of file
+from .models import *
+from .storage import *
@@ -49,7 +49,7 @@ class BlacklistClearButton(discord.ui.View):
         if server:
             del self.blacklist[server_id]
 
-            interaction.client.update_json("./files/blacklist.json", self.blacklist)
+            interaction.client.cache.mark_dirty("blacklist", server_id)
             embed = discord.Embed(title="🛠️ Blacklist Successfully Deleted")
 
             await interaction.followup.send(embed=embed)
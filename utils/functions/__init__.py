@@ -1,3 +1,4 @@
 from .authorization_check_ import authorization_check
 from .executor_ import executor
 from .session_check_ import session_check
+from .poll_embed_ import poll_embed
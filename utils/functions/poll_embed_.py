@@ -0,0 +1,40 @@
+import datetime
+import discord
+
+BAR_LENGTH = 10
+
+
+def poll_embed(entry: dict, tally: dict[str, int], *, closed: bool = False):
+    """
+    Creates an embed showing a poll's question and its current results.
+    """
+    embed = discord.Embed(
+        title=f"📢 Poll by **{entry['author']}**:",
+        description=f"```❓ {entry['question']}```\n",
+    )
+
+    total = sum(tally.values())
+
+    for emoji, label in entry["options"]:
+        count = tally.get(emoji, 0)
+        share = count / total if total else 0.0
+        filled = round(share * BAR_LENGTH)
+        bar = "█" * filled + "░" * (BAR_LENGTH - filled)
+
+        embed.add_field(
+            name=f"{emoji} {label}",
+            value=f"`{bar}` {count} ({share:.0%})",
+            inline=False,
+        )
+
+    if closed:
+        embed.set_footer(text=f"🔒 This poll has closed with {total} votes.")
+    elif entry["closes_at"] is not None:
+        embed.set_footer(text="Vote by reacting below. Closes")
+        embed.timestamp = datetime.datetime.fromtimestamp(
+            entry["closes_at"], tz=datetime.timezone.utc
+        )
+    else:
+        embed.set_footer(text="Vote by reacting below.")
+
+    return embed
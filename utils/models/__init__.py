@@ -1,3 +1,13 @@
+from .tokenizer import Tokenizer
+from .blacklist_matcher import BlacklistMatcher
+from .guild_feature import GuildFeature
+from .reaction_role_index import ReactionRoleIndex
+from .poll_index import PollIndex
+from .poll_updater import PollUpdater
+from .deletion_queue import DeletionMetrics, DeletionQueue
+from .role_update_queue import RoleUpdateQueue
+from .spam_detector import SpamDetector
 from .cache import Cache
+from .reaction_reconciler import ReactionReconciler, ReconcileProgress
 from .twitch_broadcast import TwitchBroadcast
-from .twitch import Twitch
\ No newline at end of file
+from .twitch import Twitch
@@ -0,0 +1,398 @@
+import functools
+import re
+import regex
+import sys
+
+from typing import Iterable, Optional
+from .tokenizer import Tokenizer
+
+try:
+    from re import _parser as sre_parse  # Python 3.11+
+except ImportError:
+    import sre_parse
+
+PATTERN_PREFIX = "re:"
+WILDCARD = "*"
+MAX_PATTERN_LENGTH = 100
+MAX_UNBOUNDED_REPEATS = 2
+
+# Seconds a message's pattern search can take before it's abandoned. Python's re
+# module can't time out, so patterns are run with the regex module instead
+PATTERN_TIMEOUT = 0.05
+
+REPEATS = tuple(
+    getattr(sre_parse, op)
+    for op in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+    if hasattr(sre_parse, op)
+)
+
+
+@functools.lru_cache(maxsize=256)
+def compile_patterns(patterns: tuple[str, ...]) -> Optional[regex.Pattern]:
+    """
+    Compiles regular expressions into a single alternation. Guilds with the same
+    patterns share the compiled result.
+    """
+    if not patterns:
+        return None
+
+    return regex.compile("|".join(f"(?:{pattern})" for pattern in patterns), regex.I)
+
+
+def search(pattern: Optional[regex.Pattern], text: str) -> bool:
+    """
+    Returns whether a compiled pattern matches part of the text. Searches that take
+    longer than PATTERN_TIMEOUT are abandoned and count as not matching, so a slow
+    pattern can't block the event loop.
+    """
+    if pattern is None:
+        return False
+
+    try:
+        return pattern.search(text, timeout=PATTERN_TIMEOUT) is not None
+    except TimeoutError:
+        print(f"Blacklist pattern timed out: {pattern.pattern}", file=sys.stderr)
+        return False
+
+
+def _check_complexity(parsed, inside_repeat: bool = False, repeats: int = 0) -> int:
+    """
+    Rejects regular expressions that could backtrack catastrophically, such as
+    repeats and alternations inside other repeats. Returns the number of unbounded
+    repeats found. Searches are also timed out, so this only has to catch the
+    patterns that would always be slow.
+    """
+    for op, av in parsed:
+        if op in (sre_parse.GROUPREF, sre_parse.GROUPREF_EXISTS):
+            raise ValueError("Patterns can't use backreferences.")
+
+        if op in REPEATS:
+            _, high, body = av
+
+            if inside_repeat:
+                raise ValueError("Patterns can't nest repeats such as `(a+)+`.")
+
+            repeats = _check_complexity(body, True, repeats)
+            repeats += high == sre_parse.MAXREPEAT
+
+        elif op == sre_parse.SUBPATTERN:
+            repeats = _check_complexity(av[-1], inside_repeat, repeats)
+
+        elif op == getattr(sre_parse, "ATOMIC_GROUP", None):  # Python 3.11+
+            repeats = _check_complexity(av, inside_repeat, repeats)
+
+        elif op == sre_parse.BRANCH:
+            if inside_repeat:
+                raise ValueError(
+                    "Patterns can't repeat alternatives such as `(a|aa)+`."
+                )
+
+            for branch in av[1]:
+                repeats = _check_complexity(branch, inside_repeat, repeats)
+
+        elif op in (sre_parse.ASSERT, sre_parse.ASSERT_NOT):
+            repeats = _check_complexity(av[1], inside_repeat, repeats)
+
+    if repeats > MAX_UNBOUNDED_REPEATS:
+        raise ValueError(
+            f"Patterns can't use more than {MAX_UNBOUNDED_REPEATS} `*` or `+` repeats."
+        )
+
+    return repeats
+
+
+def _common_prefix(first: str, second: str) -> int:
+    """
+    Returns the length of the common prefix of two strings, comparing slices so
+    the work happens in C.
+    """
+    low, high = 0, min(len(first), len(second))
+
+    while low < high:
+        middle = (low + high + 1) // 2
+
+        if first[:middle] == second[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
+
+
+def _common_suffix(first: str, second: str, limit: int) -> int:
+    """
+    Returns the length of the common suffix of two strings, up to a limit.
+    """
+    low, high = 0, limit
+
+    while low < high:
+        middle = (low + high + 1) // 2
+
+        if first[len(first) - middle :] == second[len(second) - middle :]:
+            low = middle
+        else:
+            high = middle - 1
+
+    return low
+
+
+def _word_start(text: str, index: int, words: int) -> int:
+    """
+    Moves an index back to the start of its word, then back another few words.
+    """
+    while index > 0 and not text[index - 1].isspace():
+        index -= 1
+
+    for _ in range(words):
+        while index > 0 and text[index - 1].isspace():
+            index -= 1
+
+        while index > 0 and not text[index - 1].isspace():
+            index -= 1
+
+    return index
+
+
+def _word_end(text: str, index: int, words: int) -> int:
+    """
+    Moves an index forward to the end of its word, then forward another few words.
+    """
+    while index < len(text) and not text[index].isspace():
+        index += 1
+
+    for _ in range(words):
+        while index < len(text) and text[index].isspace():
+            index += 1
+
+        while index < len(text) and not text[index].isspace():
+            index += 1
+
+    return index
+
+
+class BlacklistMatcher:
+    """
+    Compiled form of a guild's blacklist, built once and reused for every message.
+
+    Single words are checked against the words in a message with a frozenset, and
+    phrases are found with an Aho-Corasick automaton. Wildcards (entries containing
+    `*`) are combined into a single pattern, as are regular expressions (entries
+    starting with `re:`), so checking a message costs one pass over its text for
+    each kind of entry, however many entries the blacklist has. Words, phrases and
+    wildcards are normalized by the same Tokenizer. Regular expressions are matched
+    against the message as it was written, only normalized and casefolded, so they
+    can match punctuation and digits.
+    """
+
+    __slots__ = (
+        "words",
+        "phrases",
+        "pattern",
+        "wildcards",
+        "span",
+        "tokenizer",
+        "_goto",
+        "_fail",
+        "_output",
+    )
+
+    def __init__(self, entries: Iterable[str], *, tokenizer: Tokenizer = None):
+        self.tokenizer = tokenizer or Tokenizer()
+        words, phrases, patterns, wildcards = set(), set(), set(), set()
+
+        # The most words any entry can match, used to re-check edits incrementally.
+        # For regular expressions this is an estimate based on the spaces they match
+        self.span = 1
+
+        for entry in entries:
+            try:
+                self.validate_entry(entry)
+            except ValueError:  # Skip entries that were added before validation
+                continue
+
+            if entry.startswith(PATTERN_PREFIX):
+                pattern = entry.removeprefix(PATTERN_PREFIX)
+                patterns.add(pattern)
+
+                spaces = pattern.count(" ") + pattern.count(r"\s")
+                self.span = max(self.span, spaces + 1)
+                continue
+
+            self.span = max(self.span, len(entry.split()))
+
+            if WILDCARD in entry:
+                wildcards.add(self._wildcard_to_pattern(entry))
+                continue
+
+            entry = " ".join(self.tokenizer.tokenize(entry))
+
+            if entry:
+                (phrases if " " in entry else words).add(entry)
+
+        self.words = frozenset(words)
+        self.phrases = frozenset(phrases)
+        self.pattern = compile_patterns(tuple(sorted(patterns)))
+        self.wildcards = compile_patterns(tuple(sorted(wildcards)))
+
+        self._goto: list[dict[str, int]] = [{}]
+        self._fail: list[int] = [0]
+        self._output: list[bool] = [False]
+
+        for phrase in self.phrases:
+            # Padding with spaces means phrases only match whole words
+            self._insert(f" {phrase} ")
+
+        self._build_failure_links()
+
+    @staticmethod
+    def normalize_entry(entry: str) -> str:
+        """
+        Strips an entry and lowercases it, unless it's a regular expression.
+        """
+        entry = entry.strip()
+        return entry if entry.startswith(PATTERN_PREFIX) else entry.lower()
+
+    @staticmethod
+    def validate_entry(entry: str) -> None:
+        """
+        Raises ValueError with a reason if an entry can't be added to a blacklist.
+        """
+        if not entry.startswith(PATTERN_PREFIX):
+            if WILDCARD in entry and not entry.replace(WILDCARD, "").strip():
+                raise ValueError("Wildcards need at least one other character.")
+
+            return
+
+        pattern = entry.removeprefix(PATTERN_PREFIX)
+
+        if not pattern:
+            raise ValueError("Patterns can't be empty.")
+
+        if len(pattern) > MAX_PATTERN_LENGTH:
+            raise ValueError(
+                f"Patterns can't be longer than {MAX_PATTERN_LENGTH} characters."
+            )
+
+        try:
+            # Compile it as part of an alternation, since that's how it will be used
+            parsed = sre_parse.parse(f"(?:{pattern})|")
+        except re.error as error:
+            raise ValueError(f"Invalid pattern: {error}.") from error
+
+        _check_complexity(parsed)
+
+        if re.search(f"(?:{pattern})", ""):
+            raise ValueError("Patterns can't match an empty message.")
+
+    def _wildcard_to_pattern(self, entry: str) -> str:
+        """
+        Converts a wildcard entry into a regular expression that matches whole words.
+        Each `*` matches part of a word, or a whole word if it's between spaces.
+        """
+        parts = []
+
+        for part in re.split(r"\*+", entry):
+            words = " ".join(self.tokenizer.tokenize(part))
+
+            # Keep the spaces around a wildcard, which tokenizing drops
+            if words and part[:1].isspace():
+                words = f" {words}"
+
+            if words and part[-1:].isspace():
+                words = f"{words} "
+
+            parts.append(re.escape(words))
+
+        return r"(?<!\S)" + r"\S*".join(parts) + r"(?!\S)"
+
+    def _insert(self, pattern: str) -> None:
+        """
+        Adds a pattern to the trie.
+        """
+        state = 0
+
+        for char in pattern:
+            if char not in self._goto[state]:
+                self._goto.append({})
+                self._fail.append(0)
+                self._output.append(False)
+                self._goto[state][char] = len(self._goto) - 1
+
+            state = self._goto[state][char]
+
+        self._output[state] = True
+
+    def _build_failure_links(self) -> None:
+        """
+        Links each state to the longest proper suffix that is also in the trie.
+        """
+        queue = list(self._goto[0].values())
+
+        for state in queue:  # Breadth first, as the queue grows while iterating
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+
+                self._fail[next_state] = self._goto[fail].get(char, 0)
+                self._output[next_state] |= self._output[self._fail[next_state]]
+
+    def matches(self, content: str) -> bool:
+        """
+        Returns True if the content contains a blacklisted word, phrase or pattern.
+        """
+        for words in self.tokenizer.forms(content):
+            if not self.words.isdisjoint(words):
+                return True
+
+            text = " ".join(words)
+
+            if search(self.wildcards, text):
+                return True
+
+            if self.phrases and self._search_phrases(f" {text} "):
+                return True
+
+        return search(self.pattern, self.tokenizer.normalize(content))
+
+    def matches_edit(self, before: str, after: str) -> bool:
+        """
+        Returns True if an edit to a message that didn't match adds a blacklisted
+        word, phrase or pattern.
+
+        Only the changed part of the message, plus enough surrounding words for a
+        phrase to overlap it, is checked.
+        """
+        if before == after:
+            return False
+
+        start = _common_prefix(before, after)
+        suffix = _common_suffix(before, after, min(len(before), len(after)) - start)
+        end = len(after) - suffix
+
+        # Widen the changed part to whole words, then by the words an entry could
+        # share with unchanged text on either side
+        start = _word_start(after, start, self.span - 1)
+        end = _word_end(after, end, self.span - 1)
+
+        return self.matches(after[start:end])
+
+    def _search_phrases(self, text: str) -> bool:
+        """
+        Runs the Aho-Corasick automaton over the text.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+
+        for char in text:
+            while state and char not in goto[state]:
+                state = fail[state]
+
+            state = goto[state].get(char, 0)
+
+            if output[state]:
+                return True
+
+        return False
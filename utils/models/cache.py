@@ -1,7 +1,111 @@
 from dataclasses import dataclass, field
+from typing import Optional
+from .blacklist_matcher import BlacklistMatcher
+from .guild_feature import GuildFeature
+from .poll_index import PollIndex
+from .reaction_role_index import ReactionRoleIndex
+from .tokenizer import Tokenizer
+
+# Attributes keyed by guild ID that turn on a message filter when non-empty
+FEATURES = {
+    "blacklist": GuildFeature.BLACKLIST,
+    "antispam": GuildFeature.ANTISPAM,
+}
 
 
 @dataclass(slots=True, kw_only=True, repr=True)
 class Cache:
     blacklist: dict = field(default_factory=dict)
-    reactionroles: dict = field(default_factory=dict)
\ No newline at end of file
+    reactionroles: ReactionRoleIndex = field(default_factory=ReactionRoleIndex)
+    antispam: dict = field(default_factory=dict)
+    polls: PollIndex = field(default_factory=PollIndex)
+    reconciled: dict = field(default_factory=dict)
+    dirty: dict = field(default_factory=dict, repr=False)
+    blacklist_matchers: dict = field(default_factory=dict, repr=False)
+    guild_features: dict = field(default_factory=dict, repr=False)
+    tokenizer: Tokenizer = field(default_factory=Tokenizer, repr=False)
+
+    def __post_init__(self) -> None:
+        if not isinstance(self.reactionroles, ReactionRoleIndex):
+            self.reactionroles = ReactionRoleIndex(self.reactionroles)
+
+        if not isinstance(self.polls, PollIndex):
+            self.polls = PollIndex(self.polls)
+
+        for key in FEATURES:
+            self._update_features(key)
+
+    def mark_dirty(self, key: str, *items) -> None:
+        """
+        Marks an attribute as modified so it is written on the next flush, and
+        anything compiled from it is rebuilt.
+
+        Items narrow the change down to specific entries, such as guild IDs in the
+        blacklist or message IDs in reactionroles and polls. Without them, the whole
+        attribute is written.
+        """
+        if key == "blacklist":
+            self._invalidate(self.blacklist_matchers, items)
+
+        if key in FEATURES:
+            self._update_features(key, items)
+
+        if not items:
+            self.dirty[key] = None
+        elif key not in self.dirty:
+            self.dirty[key] = set(items)
+        elif self.dirty[key] is not None:
+            self.dirty[key].update(items)
+
+    def blacklist_matcher(self, guild_id: str) -> Optional[BlacklistMatcher]:
+        """
+        Returns the compiled blacklist for a guild, or None if it has no blacklist.
+        """
+        matcher = self.blacklist_matchers.get(guild_id)
+
+        if matcher is None and self.blacklist.get(guild_id):
+            matcher = BlacklistMatcher(
+                self.blacklist[guild_id], tokenizer=self.tokenizer
+            )
+            self.blacklist_matchers[guild_id] = matcher
+
+        return matcher
+
+    def set_feature(self, guild_id: int, feature: GuildFeature, enabled: bool) -> None:
+        """
+        Turns a feature on or off in a guild's feature bitmap.
+        """
+        features = self.guild_features.get(guild_id, GuildFeature.NONE)
+        features = features | feature if enabled else features & ~feature
+
+        if features:
+            self.guild_features[guild_id] = features
+        else:
+            self.guild_features.pop(guild_id, None)
+
+    def _update_features(self, key: str, guild_ids: tuple = ()) -> None:
+        """
+        Turns an attribute's feature on for the given guilds (or every guild, if none
+        are given) that have a non-empty entry in it, and off for the rest.
+        """
+        feature, data = FEATURES[key], getattr(self, key)
+
+        if not guild_ids:  # The whole attribute may have been replaced
+            for guild_id in list(self.guild_features):
+                self.set_feature(guild_id, feature, False)
+
+            guild_ids = tuple(data)
+
+        for guild_id in guild_ids:
+            self.set_feature(int(guild_id), feature, bool(data.get(guild_id)))
+
+    @staticmethod
+    def _invalidate(compiled: dict, items: tuple) -> None:
+        """
+        Drops compiled data for the given items, or for every item if none are given.
+        """
+        if not items:
+            return compiled.clear()
+
+        for item in items:
+            compiled.pop(item, None)
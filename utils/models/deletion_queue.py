@@ -0,0 +1,137 @@
+import asyncio
+import datetime
+import time
+import discord
+
+from dataclasses import dataclass
+
+BULK_DELETE_LIMIT = 100
+# Discord only bulk deletes messages younger than 14 days. Leave a margin in case
+# the window or clock drift pushes a message over the limit
+BULK_DELETE_MAX_AGE = datetime.timedelta(days=14) - datetime.timedelta(minutes=5)
+
+
+@dataclass(slots=True, kw_only=True, repr=True)
+class DeletionMetrics:
+    queued: int = 0
+    deleted: int = 0
+    failed: int = 0
+    bulk_requests: int = 0
+    single_requests: int = 0
+    depth: int = 0
+    max_depth: int = 0
+    total_latency: float = 0.0
+    max_latency: float = 0.0
+
+    @property
+    def average_latency(self) -> float:
+        """
+        Returns the average number of seconds between queueing and deleting.
+        """
+        return self.total_latency / self.deleted if self.deleted else 0.0
+
+
+class DeletionQueue:
+    """
+    Collects messages to delete in each channel over a short window, then deletes
+    them with as few requests as possible.
+
+    Messages younger than 14 days are deleted up to 100 at a time with
+    TextChannel.delete_messages. Older messages, and any batch Discord rejects, are
+    deleted one by one.
+    """
+
+    def __init__(self, *, window: float = 0.5):
+        self.window = window
+        self.metrics = DeletionMetrics()
+
+        self._pending: dict[int, dict[int, float]] = {}
+        self._tasks: set[asyncio.Task] = set()
+
+    def schedule(self, channel: discord.abc.Messageable, message_id: int) -> None:
+        """
+        Queues a message for deletion.
+        """
+        pending = self._pending.get(channel.id)
+
+        if pending is None:
+            pending = self._pending[channel.id] = {}
+            task = asyncio.create_task(self._flush_after_window(channel))
+
+            self._tasks.add(task)
+            task.add_done_callback(self._tasks.discard)
+
+        if message_id in pending:
+            return
+
+        pending[message_id] = time.monotonic()
+
+        self.metrics.queued += 1
+        self.metrics.depth += 1
+        self.metrics.max_depth = max(self.metrics.max_depth, self.metrics.depth)
+
+    async def _flush_after_window(self, channel: discord.abc.Messageable) -> None:
+        """
+        Waits for more messages to be queued in a channel, then deletes them all.
+        """
+        await asyncio.sleep(self.window)
+        pending = self._pending.pop(channel.id)
+
+        try:
+            await self._delete(channel, pending)
+        finally:
+            self.metrics.depth -= len(pending)
+
+    async def _delete(
+        self, channel: discord.abc.Messageable, pending: dict[int, float]
+    ) -> None:
+        """
+        Deletes queued messages in bulk where possible.
+        """
+        cutoff = discord.utils.utcnow() - BULK_DELETE_MAX_AGE
+        recent, single = [], []
+
+        for message_id in pending:
+            if discord.utils.snowflake_time(message_id) > cutoff:
+                recent.append(message_id)
+            else:
+                single.append(message_id)
+
+        for index in range(0, len(recent), BULK_DELETE_LIMIT):
+            batch = recent[index : index + BULK_DELETE_LIMIT]
+
+            if len(batch) == 1:  # Bulk deletes need at least two messages
+                single += batch
+                continue
+
+            try:
+                self.metrics.bulk_requests += 1
+                await channel.delete_messages([discord.Object(id=id) for id in batch])
+            except discord.HTTPException:
+                single += batch
+            else:
+                self._record(batch, pending)
+
+        for message_id in single:
+            try:
+                self.metrics.single_requests += 1
+                await channel.get_partial_message(message_id).delete()
+            except discord.NotFound:  # Someone else deleted it first
+                self._record([message_id], pending)
+            except discord.HTTPException:
+                self.metrics.failed += 1
+            else:
+                self._record([message_id], pending)
+
+    def _record(self, message_ids: list[int], pending: dict[int, float]) -> None:
+        """
+        Updates the latency metrics for deleted messages.
+        """
+        now = time.monotonic()
+
+        for message_id in message_ids:
+            latency = now - pending[message_id]
+
+            self.metrics.deleted += 1
+            self.metrics.total_latency += latency
+            self.metrics.max_latency = max(self.metrics.max_latency, latency)
@@ -0,0 +1,11 @@
+import enum
+
+
+class GuildFeature(enum.IntFlag):
+    """
+    Bitmap of the message filters a guild has enabled.
+    """
+
+    NONE = 0
+    BLACKLIST = enum.auto()
+    ANTISPAM = enum.auto()
@@ -0,0 +1,142 @@
+import heapq
+
+from collections import Counter
+from typing import Iterable, Iterator, Optional
+
+
+class PollIndex:
+    """
+    In-memory store of open polls, with a running tally of each poll's votes.
+
+    Entries are the same dictionaries that are stored in the database, keyed by
+    message ID. Votes are keyed by the user's ID as a string, so entries can be
+    written to JSON as they are. Tallies are only ever adjusted by the vote that
+    changed them, so reading a poll's results doesn't count its votes.
+    """
+
+    __slots__ = ("_polls", "_tallies", "_closing")
+
+    def __init__(self, entries: Iterable[dict] = ()):
+        self._polls: dict[int, dict] = {}
+        self._tallies: dict[int, Counter] = {}
+        self._closing: list[tuple[float, int]] = []
+
+        for entry in entries:
+            self.add(entry)
+
+    def __iter__(self) -> Iterator[dict]:
+        yield from self._polls.values()
+
+    def __len__(self) -> int:
+        return len(self._polls)
+
+    def __contains__(self, msg_id: int) -> bool:
+        return msg_id in self._polls
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    def add(self, entry: dict) -> None:
+        """
+        Adds a poll, replacing any poll on the same message.
+        """
+        msg_id = entry["msg_id"]
+
+        self._polls[msg_id] = entry
+        self._tallies[msg_id] = Counter(entry["votes"].values())
+
+        if entry["closes_at"] is not None:
+            heapq.heappush(self._closing, (entry["closes_at"], msg_id))
+
+    def get(self, msg_id: int) -> Optional[dict]:
+        """
+        Returns the poll on a message, if there is one.
+        """
+        return self._polls.get(msg_id)
+
+    def tally(self, msg_id: int) -> dict[str, int]:
+        """
+        Returns the number of votes for each of a poll's options, keyed by emoji.
+        """
+        options, tally = self._polls[msg_id]["options"], self._tallies[msg_id]
+        return {emoji: tally.get(emoji, 0) for emoji, _ in options}
+
+    def is_option(self, msg_id: int, emoji: str) -> bool:
+        """
+        Returns whether an emoji is one of an open poll's options.
+        """
+        entry = self._polls.get(msg_id)
+
+        if entry is None:
+            return False
+
+        return any(emoji == option for option, _ in entry["options"])
+
+    def vote(self, msg_id: int, user_id: int, emoji: str) -> Optional[str]:
+        """
+        Records a member's vote. Returns their previous choice if this replaces it,
+        so that reaction can be removed.
+        """
+        votes, tally = self._polls[msg_id]["votes"], self._tallies[msg_id]
+        previous = votes.get(str(user_id))
+
+        if previous == emoji:
+            return None
+
+        if previous is not None:
+            tally[previous] -= 1
+
+        votes[str(user_id)] = emoji
+        tally[emoji] += 1
+
+        return previous
+
+    def unvote(self, msg_id: int, user_id: int, emoji: str) -> bool:
+        """
+        Removes a member's vote if it was for the given choice. Returns False if it
+        wasn't, e.g. because the reaction was removed after they changed their vote.
+        """
+        entry = self._polls.get(msg_id)
+
+        if entry is None or entry["votes"].get(str(user_id)) != emoji:
+            return False
+
+        del entry["votes"][str(user_id)]
+        self._tallies[msg_id][emoji] -= 1
+
+        return True
+
+    def due(self, now: float) -> list[int]:
+        """
+        Returns the message IDs of open polls whose close time has passed.
+        """
+        due = []
+
+        while self._closing and self._closing[0][0] <= now:
+            closes_at, msg_id = heapq.heappop(self._closing)
+            entry = self._polls.get(msg_id)
+
+            # Skip polls that were removed or replaced since they were queued
+            if entry is not None and entry["closes_at"] == closes_at:
+                due.append(msg_id)
+
+        return due
+
+    def remove(self, msg_id: int) -> Optional[dict]:
+        """
+        Removes and returns the poll on a message, if there is one.
+        """
+        self._tallies.pop(msg_id, None)
+        return self._polls.pop(msg_id, None)
+
+    def remove_guild(self, guild_id: int) -> list[dict]:
+        """
+        Removes and returns every poll in a guild.
+        """
+        msg_ids = [
+            msg_id
+            for msg_id, entry in self._polls.items()
+            if entry["guild_id"] == guild_id
+        ]
+
+        return [self.remove(msg_id) for msg_id in msg_ids]
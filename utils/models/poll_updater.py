@@ -0,0 +1,78 @@
+import asyncio
+import time
+import discord
+
+from typing import Callable, Optional
+
+
+class PollUpdater:
+    """
+    Coalesces edits to live poll results, so each poll's message is edited at most
+    once every interval seconds no matter how many votes come in.
+
+    The first change to a poll is shown straight away. Changes within the interval
+    after an edit are collected into a single edit at the end of it, rendered from
+    the poll's results at that point.
+    """
+
+    def __init__(
+        self,
+        render: Callable[[int], Optional[discord.Embed]],
+        *,
+        interval: float = 5.0,
+    ):
+        self.render = render
+        self.interval = interval
+        self.requested = 0
+        self.edits = 0
+
+        self._pending: dict[int, asyncio.Task] = {}
+        self._last_edit: dict[int, float] = {}
+
+    def schedule(self, channel: discord.abc.Messageable, message_id: int) -> None:
+        """
+        Queues an edit to show a poll's latest results.
+        """
+        self.requested += 1
+
+        if message_id in self._pending:  # The pending edit will include this change
+            return
+
+        last_edit = self._last_edit.get(message_id, float("-inf"))
+        delay = max(0.0, last_edit + self.interval - time.monotonic())
+
+        self._pending[message_id] = asyncio.create_task(
+            self._edit_after(channel, message_id, delay)
+        )
+
+    def cancel(self, message_id: int) -> None:
+        """
+        Drops any pending edit to a poll, e.g. because it has closed.
+        """
+        task = self._pending.pop(message_id, None)
+        self._last_edit.pop(message_id, None)
+
+        if task is not None:
+            task.cancel()
+
+    async def _edit_after(
+        self, channel: discord.abc.Messageable, message_id: int, delay: float
+    ) -> None:
+        """
+        Waits out the rest of the interval, then edits the poll's message.
+        """
+        await asyncio.sleep(delay)
+        del self._pending[message_id]
+
+        embed = self.render(message_id)
+
+        if embed is None:  # The poll was removed in the meantime
+            return
+
+        self._last_edit[message_id] = time.monotonic()
+        self.edits += 1
+
+        try:
+            await channel.get_partial_message(message_id).edit(embed=embed)
+        except discord.HTTPException:  # Try again on the next vote
+            pass
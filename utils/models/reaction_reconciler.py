@@ -0,0 +1,229 @@
+import asyncio
+import time
+import discord
+
+from dataclasses import dataclass
+from discord.ext import commands
+from typing import Optional
+from .cache import Cache
+from .reaction_role_index import ReactionRoleIndex
+from .role_update_queue import RoleUpdateQueue
+
+# Reaction.users fetches this many users per request
+USERS_PER_PAGE = 100
+
+
+@dataclass(slots=True, kw_only=True, repr=True)
+class ReconcileProgress:
+    total: int = 0
+    done: int = 0
+    failed: int = 0
+    api_calls: int = 0
+    roles_added: int = 0
+
+
+class ReactionReconciler:
+    """
+    Applies reaction roles for reactions that were added while the bot was offline.
+
+    Each reaction role message is fetched and the users of its reactions are paged
+    through, and anyone who reacted but doesn't have the role gets it through the
+    RoleUpdateQueue, so each member gets at most one request. Roles aren't removed
+    from members who didn't react, since they may have been given the role some
+    other way.
+
+    Guilds are processed concurrently, up to a limit, and each guild's messages one
+    at a time. When each message was last reconciled is saved in the database, and
+    messages reconciled in the last min_interval seconds are skipped. So a run that
+    is interrupted, by a failure or a restart, resumes where it left off, and
+    reconnecting to the gateway doesn't fetch every message again.
+    """
+
+    def __init__(
+        self,
+        cache: Cache,
+        role_queue: RoleUpdateQueue,
+        *,
+        concurrency: int = 4,
+        report_every: int = 25,
+        min_interval: float = 15 * 60,
+    ):
+        self.cache = cache
+        self.role_queue = role_queue
+        self.concurrency = concurrency
+        self.report_every = report_every
+        self.min_interval = min_interval
+        self.progress = ReconcileProgress()
+
+        self._task: asyncio.Task = None
+
+    def start(self, client: commands.Bot) -> None:
+        """
+        Starts a run in the background, unless one is already running.
+        """
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self.run(client))
+
+    async def run(self, client: commands.Bot) -> None:
+        """
+        Reconciles every reaction role message that hasn't been recently.
+        """
+        reactionroles, reconciled = self.cache.reactionroles, self.cache.reconciled
+
+        # Forget messages that aren't reaction role messages any more
+        removed = [msg_id for msg_id in reconciled if int(msg_id) not in reactionroles]
+
+        for msg_id in removed:
+            del reconciled[msg_id]
+
+        if removed:
+            self.cache.mark_dirty("reconciled", *removed)
+
+        cutoff = time.time() - self.min_interval
+        guilds = {
+            guild_id: {
+                item["msg_id"]
+                for item in reactionroles.for_guild(guild_id)
+                if reconciled.get(str(item["msg_id"]), 0) < cutoff
+            }
+            for guild_id in reactionroles.guild_ids()
+        }
+
+        self.progress = ReconcileProgress(
+            total=sum(len(msg_ids) for msg_ids in guilds.values())
+        )
+        semaphore = asyncio.Semaphore(self.concurrency)
+
+        await asyncio.gather(
+            *(
+                self._reconcile_guild(client, guild_id, msg_ids, semaphore)
+                for guild_id, msg_ids in guilds.items()
+            )
+        )
+
+        self._report()
+
+    async def _reconcile_guild(
+        self,
+        client: commands.Bot,
+        guild_id: int,
+        msg_ids: set[int],
+        semaphore: asyncio.Semaphore,
+    ) -> None:
+        """
+        Reconciles a guild's reaction role messages one at a time.
+        """
+        async with semaphore:
+            guild = client.get_guild(guild_id)
+
+            for msg_id in msg_ids:
+                if guild is None or guild.unavailable:
+                    self.progress.failed += 1
+                else:
+                    await self._try_reconcile_message(guild, msg_id)
+
+                self.progress.done += 1
+
+                if self.progress.done % self.report_every == 0:
+                    self._report()
+
+    async def _try_reconcile_message(self, guild: discord.Guild, msg_id: int) -> None:
+        """
+        Reconciles a message, saving when it was if that succeeded.
+        """
+        try:
+            await self._reconcile_message(guild, msg_id)
+        except discord.HTTPException:
+            self.progress.failed += 1
+        else:
+            self.cache.reconciled[str(msg_id)] = time.time()
+            self.cache.mark_dirty("reconciled", str(msg_id))
+
+    async def _reconcile_message(self, guild: discord.Guild, msg_id: int) -> None:
+        """
+        Gives the role for each reaction on a message to the members who reacted
+        with it and don't have it.
+        """
+        entries = self.cache.reactionroles.message(msg_id)
+
+        if not entries:  # Removed since the run started
+            return
+
+        message = await self._fetch_message(guild, msg_id, entries)
+
+        if message is None:
+            return
+
+        for reaction in message.reactions:
+            entry = entries.get(ReactionRoleIndex.emoji_key(reaction.emoji))
+
+            if entry is None or guild.get_role(entry["role_id"]) is None:
+                continue
+
+            users = 0
+
+            async for user in reaction.users(limit=None):
+                users += 1
+                member = guild.get_member(user.id)
+
+                if member is None or member.bot:
+                    continue
+
+                if member.get_role(entry["role_id"]) is None:
+                    self.role_queue.schedule(member, entry["role_id"], True)
+                    self.progress.roles_added += 1
+
+            self.progress.api_calls += users // USERS_PER_PAGE + 1
+
+    async def _fetch_message(
+        self, guild: discord.Guild, msg_id: int, entries: dict[str, dict]
+    ) -> Optional[discord.Message]:
+        """
+        Fetches a reaction role message from its stored channel. Entries created
+        before channels were stored are looked for in every text channel, and their
+        channel is stored once it's found.
+        """
+        channel_id = next(iter(entries.values())).get("channel_id")
+
+        if channel_id is not None:
+            channels = [guild.get_channel_or_thread(channel_id)]
+        else:
+            channels = guild.text_channels
+
+        for channel in channels:
+            if channel is None:
+                continue
+
+            try:
+                self.progress.api_calls += 1
+                message = await channel.fetch_message(msg_id)
+            except discord.NotFound:
+                if channel_id is not None:  # It was deleted while the bot was offline
+                    self.cache.reactionroles.remove_message(msg_id)
+                    self.cache.mark_dirty("reactionroles", msg_id)
+
+                continue
+            except discord.Forbidden:
+                continue
+
+            if channel_id is None:
+                for entry in entries.values():
+                    entry["channel_id"] = channel.id
+
+                self.cache.mark_dirty("reactionroles", msg_id)
+
+            return message
+
+        return None
+
+    def _report(self) -> None:
+        """
+        Prints how far the current run has got.
+        """
+        progress = self.progress
+
+        print(
+            f"Reconciled {progress.done}/{progress.total} reaction role messages "
+            + f"({progress.failed} failed, {progress.roles_added} roles added, "
+            + f"{progress.api_calls} API calls)"
+        )
@@ -0,0 +1,140 @@
+import discord
+
+from typing import Iterable, Iterator, Optional
+
+
+class ReactionRoleIndex:
+    """
+    In-memory store of reaction roles, indexed for constant time lookups.
+
+    Entries are the same dictionaries that are stored in the database, keyed by
+    message ID and emoji, with secondary indexes on guild ID and role ID. Custom
+    emojis are keyed by their ID, since several can share a name.
+    """
+
+    __slots__ = ("_messages", "_guilds", "_roles")
+
+    def __init__(self, entries: Iterable[dict] = ()):
+        self._messages: dict[int, dict[str, dict]] = {}
+        self._guilds: dict[int, set[tuple[int, str]]] = {}
+        self._roles: dict[int, set[tuple[int, str]]] = {}
+
+        for entry in entries:
+            self.add(entry)
+
+    def __iter__(self) -> Iterator[dict]:
+        for emojis in self._messages.values():
+            yield from emojis.values()
+
+    def __len__(self) -> int:
+        return sum(len(emojis) for emojis in self._messages.values())
+
+    def __contains__(self, msg_id: int) -> bool:
+        return msg_id in self._messages
+
+    def __repr__(self) -> str:
+        return f"{self.__class__.__name__}({list(self)!r})"
+
+    def add(self, entry: dict) -> None:
+        """
+        Adds an entry, replacing any entry for the same message and emoji.
+        """
+        # Entries created before emojis were keyed by ID store them as typed
+        entry["emoji"] = self.emoji_key(entry["emoji"])
+        key = (entry["msg_id"], entry["emoji"])
+        self.remove(*key)
+
+        self._messages.setdefault(key[0], {})[key[1]] = entry
+        self._guilds.setdefault(entry["guild_id"], set()).add(key)
+        self._roles.setdefault(entry["role_id"], set()).add(key)
+
+    def get(self, msg_id: int, emoji: str) -> Optional[dict]:
+        """
+        Returns the entry for a message and emoji, if there is one.
+        """
+        return self._messages.get(msg_id, {}).get(emoji)
+
+    def message(self, msg_id: int) -> dict[str, dict]:
+        """
+        Returns a copy of the entries for a message, keyed by emoji.
+        """
+        return dict(self._messages.get(msg_id, {}))
+
+    def guild_ids(self) -> list[int]:
+        """
+        Returns the ID of every guild with at least one entry.
+        """
+        return list(self._guilds)
+
+    def for_guild(self, guild_id: int) -> list[dict]:
+        """
+        Returns every entry in a guild.
+        """
+        return [self.get(*key) for key in self._guilds.get(guild_id, ())]
+
+    def for_role(self, role_id: int) -> list[dict]:
+        """
+        Returns every entry that gives a role.
+        """
+        return [self.get(*key) for key in self._roles.get(role_id, ())]
+
+    def remove(self, msg_id: int, emoji: str) -> Optional[dict]:
+        """
+        Removes and returns the entry for a message and emoji, if there is one.
+        """
+        emojis = self._messages.get(msg_id)
+
+        if emojis is None or (entry := emojis.pop(emoji, None)) is None:
+            return None
+
+        if not emojis:
+            del self._messages[msg_id]
+
+        self._discard(self._guilds, entry["guild_id"], (msg_id, emoji))
+        self._discard(self._roles, entry["role_id"], (msg_id, emoji))
+
+        return entry
+
+    def remove_message(self, msg_id: int) -> list[dict]:
+        """
+        Removes and returns every entry for a message.
+        """
+        return [self.remove(msg_id, emoji) for emoji in self.message(msg_id)]
+
+    def remove_guild(self, guild_id: int) -> list[dict]:
+        """
+        Removes and returns every entry in a guild.
+        """
+        return [self.remove(*key) for key in list(self._guilds.get(guild_id, ()))]
+
+    def remove_role(self, role_id: int) -> list[dict]:
+        """
+        Removes and returns every entry that gives a role.
+        """
+        return [self.remove(*key) for key in list(self._roles.get(role_id, ()))]
+
+    @staticmethod
+    def emoji_key(emoji: str | discord.PartialEmoji | discord.Emoji) -> str:
+        """
+        Returns the key for an emoji: its ID if it's a custom emoji, otherwise the
+        emoji itself.
+        """
+        if isinstance(emoji, str):
+            emoji = discord.PartialEmoji.from_str(emoji)
+
+        return str(emoji.id) if emoji.id else emoji.name
+
+    @staticmethod
+    def _discard(index: dict[int, set], id: int, key: tuple[int, str]) -> None:
+        """
+        Removes a key from a secondary index, dropping empty sets.
+        """
+        keys = index.get(id)
+
+        if keys is None:
+            return
+
+        keys.discard(key)
+
+        if not keys:
+            del index[id]
@@ -0,0 +1,142 @@
+import asyncio
+import sys
+import time
+import discord
+
+# How long to trust the result of an edit over the member cache, which is updated
+# when the gateway sends the change back
+EDIT_TTL = 60.0
+
+
+class RoleUpdateQueue:
+    """
+    Collects role changes for each member over a short window, then applies them
+    with a single Member.edit call per member.
+
+    Each guild has one dispatcher task that applies its members' changes one request
+    at a time, since role edits share a rate limit per guild. While a request waits
+    on the rate limit, further changes keep merging into the pending ones, so a
+    backlog turns into fewer requests rather than a longer queue.
+
+    A batch that changes a single role uses the endpoint for adding or removing that
+    role, which can't undo anyone else's changes. Larger batches replace the whole
+    role list, based on the last edit this queue made if the gateway hasn't sent the
+    member's update back yet, so an earlier batch isn't reverted.
+    """
+
+    def __init__(self, *, window: float = 1.0):
+        self.window = window
+        self.requested = 0
+        self.edits = 0
+        self.failed = 0
+
+        self._pending: dict[int, dict[int, dict[int, bool]]] = {}
+        self._tasks: dict[int, asyncio.Task] = {}
+        # The roles before and after this queue's last edit to each member
+        self._edited: dict[tuple[int, int], tuple[set[int], set[int], float]] = {}
+
+    def schedule(self, member: discord.Member, role_id: int, add: bool) -> None:
+        """
+        Queues a role to be added to or removed from a member. A later change to the
+        same role replaces an earlier one that hasn't been applied yet.
+        """
+        guild_id = member.guild.id
+        members = self._pending.setdefault(guild_id, {})
+        members.setdefault(member.id, {})[role_id] = add
+
+        self.requested += 1
+
+        if guild_id not in self._tasks:
+            task = asyncio.create_task(self._dispatch(member.guild))
+            self._tasks[guild_id] = task
+
+    async def _dispatch(self, guild: discord.Guild) -> None:
+        """
+        Applies a guild's pending changes after each window until none are left.
+        """
+        try:
+            while self._pending.get(guild.id):
+                await asyncio.sleep(self.window)
+                members = self._pending.pop(guild.id)
+                self._forget_edits()
+
+                for member_id, roles in members.items():
+                    await self._apply(guild, member_id, roles)
+        finally:
+            del self._tasks[guild.id]
+
+    async def _apply(
+        self, guild: discord.Guild, member_id: int, roles: dict[int, bool]
+    ) -> None:
+        """
+        Applies a member's changes, if they make any difference.
+        """
+        member = guild.get_member(member_id)
+
+        if member is None:  # The member has left
+            return
+
+        current = self._current_roles(member)
+        added, removed = set(), set()
+
+        for role_id, add in roles.items():
+            if guild.get_role(role_id) is None:  # The role has been deleted
+                continue
+
+            if add and role_id not in current:
+                added.add(role_id)
+            elif not add and role_id in current:
+                removed.add(role_id)
+
+        if not added and not removed:
+            return
+
+        cached = {role.id for role in member.roles[1:]}
+        updated = (current | added) - removed
+
+        try:
+            self.edits += 1
+
+            if len(added) + len(removed) == 1:
+                if added:
+                    await member.add_roles(discord.Object(id=added.pop()))
+                else:
+                    await member.remove_roles(discord.Object(id=removed.pop()))
+            else:
+                await member.edit(roles=[discord.Object(id=id) for id in updated])
+        except discord.HTTPException as error:
+            self.failed += 1
+            print(f"Failed to update roles for {member}: {error}", file=sys.stderr)
+        else:
+            self._edited[guild.id, member.id] = (cached, updated, time.monotonic())
+
+    def _current_roles(self, member: discord.Member) -> set[int]:
+        """
+        Returns the roles a member has, apart from @everyone. Until the gateway
+        sends back this queue's last edit, the cache is out of date, so the roles
+        that edit left them with are used instead.
+        """
+        cached = {role.id for role in member.roles[1:]}  # The first is @everyone
+        key = (member.guild.id, member.id)
+        edit = self._edited.get(key)
+
+        if edit is None:
+            return cached
+
+        before, after, _ = edit
+
+        if cached == before:  # Still waiting for the update
+            return set(after)
+
+        del self._edited[key]
+        return cached
+
+    def _forget_edits(self) -> None:
+        """
+        Stops tracking edits old enough that the gateway must have sent them back.
+        """
+        expired = time.monotonic() - EDIT_TTL
+
+        for key, (_, _, edited_at) in list(self._edited.items()):
+            if edited_at < expired:
+                del self._edited[key]
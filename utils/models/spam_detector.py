@@ -0,0 +1,165 @@
+import collections
+import re
+import time
+
+from typing import Optional
+from .tokenizer import Tokenizer
+
+# Collapses characters repeated three or more times, so "heyyyy" and "heyyy" match
+REPEATED_CHARACTERS = re.compile(r"(.)\1{2,}")
+
+
+class _Entry:
+    """
+    A message remembered by the spam detector.
+    """
+
+    __slots__ = ("digest", "channel_id", "author_id", "message_id", "created")
+
+    def __init__(
+        self,
+        digest: int,
+        channel_id: int,
+        author_id: int,
+        message_id: int,
+        created: float,
+    ):
+        self.digest = digest
+        self.channel_id = channel_id
+        self.author_id = author_id
+        self.message_id: Optional[int] = message_id  # None once it's been flagged
+        self.created = created
+
+
+class _GuildState:
+    """
+    Ring buffers of recent messages per channel and per author in one guild.
+
+    Only the most recently active channels and authors keep a buffer, so the memory
+    used by a guild is capped no matter how busy it is.
+    """
+
+    __slots__ = ("channels", "authors")
+
+    def __init__(self):
+        self.channels: collections.OrderedDict[int, collections.deque] = (
+            collections.OrderedDict()
+        )
+        self.authors: collections.OrderedDict[int, collections.deque] = (
+            collections.OrderedDict()
+        )
+
+
+class SpamDetector:
+    """
+    Flags messages that repeat the same (or nearly the same) content too often.
+
+    Each message is reduced to a hash of its normalized words and remembered in
+    fixed size ring buffers for its channel and its author. When the same hash is
+    seen a number of times within a window, in either buffer, copies are flagged.
+
+    Several members sending the same short message, like "gg", is normal chat, so
+    in a channel's buffer only the copies from authors who sent it more than once
+    are flagged.
+    """
+
+    def __init__(
+        self,
+        *,
+        buffer_size: int = 10,
+        max_buffers: int = 128,
+        tokenizer: Tokenizer = None,
+    ):
+        self.buffer_size = buffer_size
+        self.max_buffers = max_buffers
+        self.tokenizer = tokenizer or Tokenizer(leetspeak=False)
+
+        self._guilds: dict[int, _GuildState] = {}
+
+    def forget(self, guild_id: int) -> None:
+        """
+        Drops everything remembered about a guild.
+        """
+        self._guilds.pop(guild_id, None)
+
+    def digest(self, content: str) -> Optional[int]:
+        """
+        Returns a hash of a message's normalized content, or None if it's empty.
+        """
+        words = self.tokenizer.tokenize(content)
+
+        if not words:  # Attachments, stickers, etc. have no text to compare
+            return None
+
+        return hash(REPEATED_CHARACTERS.sub(r"\1\1", " ".join(words)))
+
+    def check(
+        self,
+        guild_id: int,
+        channel_id: int,
+        author_id: int,
+        message_id: int,
+        content: str,
+        *,
+        messages: int,
+        seconds: float,
+    ) -> list[tuple[int, int]]:
+        """
+        Remembers a message and returns the (channel ID, message ID) of every copy
+        that should be deleted, if the message is spam.
+        """
+        digest = self.digest(content)
+
+        if digest is None:
+            return []
+
+        now = time.monotonic()
+        entry = _Entry(digest, channel_id, author_id, message_id, now)
+        state = self._guilds.setdefault(guild_id, _GuildState())
+
+        flagged = []
+
+        for buffers, key in ((state.channels, channel_id), (state.authors, author_id)):
+            buffer = self._buffer(buffers, key)
+            buffer.append(entry)
+
+            copies = [
+                item
+                for item in buffer
+                if item.digest == digest and now - item.created <= seconds
+            ]
+
+            if len(copies) < messages:
+                continue
+
+            if buffers is state.channels:
+                counts = collections.Counter(item.author_id for item in copies)
+                copies = [item for item in copies if counts[item.author_id] > 1]
+
+            flagged += copies
+
+        spam = []
+
+        for item in flagged:
+            if item.message_id is not None:
+                spam.append((item.channel_id, item.message_id))
+                item.message_id = None
+
+        return spam
+
+    def _buffer(self, buffers: collections.OrderedDict, key: int) -> collections.deque:
+        """
+        Returns the ring buffer for a channel or author, evicting the least recently
+        used buffer if the guild has too many.
+        """
+        buffer = buffers.get(key)
+
+        if buffer is None:
+            buffer = buffers[key] = collections.deque(maxlen=self.buffer_size)
+
+            if len(buffers) > self.max_buffers:
+                buffers.popitem(last=False)
+        else:
+            buffers.move_to_end(key)
+
+        return buffer
@@ -0,0 +1,100 @@
+import string
+import unicodedata
+
+LEETSPEAK = {
+    "0": "o",
+    "1": "i",
+    "3": "e",
+    "4": "a",
+    "5": "s",
+    "7": "t",
+    "@": "a",
+    "$": "s",
+}
+
+
+# Punctuation is first replaced by this, so it can then be turned into spaces or
+# deleted without translating the text twice
+SEPARATOR = "\x00"
+
+
+def _build_strip_table() -> dict[int, str | None]:
+    """
+    Returns a translation table that marks punctuation with SEPARATOR and deletes
+    invisible formatting characters, such as zero width spaces, from the Basic
+    Multilingual Plane.
+    """
+    table = dict.fromkeys(map(ord, string.punctuation), SEPARATOR)
+    table[ord(SEPARATOR)] = " "  # So text can't contain its own separators
+
+    for codepoint in range(0x10000):
+        category = unicodedata.category(chr(codepoint))
+
+        if category[0] == "P":
+            table[codepoint] = SEPARATOR
+        elif category == "Cf":
+            table[codepoint] = None
+
+    return table
+
+
+STRIP_TABLE = _build_strip_table()
+
+
+class Tokenizer:
+    """
+    Splits messages into normalized words for the moderation filter.
+
+    Text is NFKC normalized (so lookalikes such as fullwidth or bold letters become
+    plain letters), casefolded, and passed through a single precomputed translation
+    table that treats punctuation as a space and optionally folds leetspeak, before
+    being split on whitespace. forms also returns the words with punctuation
+    deleted instead, so words padded with punctuation like `b.a.d` are caught too.
+    """
+
+    __slots__ = ("leetspeak", "_table")
+
+    def __init__(self, *, leetspeak: bool = True):
+        self.leetspeak = leetspeak
+        self._table = STRIP_TABLE | (
+            {ord(char): folded for char, folded in LEETSPEAK.items()}
+            if leetspeak
+            else {}
+        )
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Returns text NFKC normalized and casefolded, without removing anything.
+        """
+        if text.isascii():  # NFKC doesn't change ASCII text, so skip the extra pass
+            return text.lower()
+
+        return unicodedata.normalize("NFKC", text).casefold()
+
+    def _translate(self, text: str) -> str:
+        """
+        Normalizes text and passes it through the translation table.
+        """
+        return self.normalize(text).translate(self._table)
+
+    def tokenize(self, text: str) -> list[str]:
+        """
+        Returns the normalized words in a piece of text.
+        """
+        return self._translate(text).replace(SEPARATOR, " ").split()
+
+    def forms(self, text: str) -> list[list[str]]:
+        """
+        Returns the normalized words in a piece of text, split at punctuation, and
+        if it has any punctuation, also with the punctuation deleted.
+        """
+        text = self._translate(text)
+
+        if SEPARATOR not in text:  # Both forms are the same
+            return [text.split()]
+
+        return [
+            text.replace(SEPARATOR, " ").split(),
+            text.replace(SEPARATOR, "").split(),
+        ]
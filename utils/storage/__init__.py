@@ -0,0 +1,4 @@
+from .storage_backend import StorageBackend
+from .json_storage import JSONStorage
+from .sqlite_storage import SQLiteStorage
+from .storage_utils import create_storage
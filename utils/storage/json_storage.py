@@ -0,0 +1,63 @@
+import json
+import os
+import tempfile
+
+from utils.models import Cache
+from .storage_backend import StorageBackend
+
+
+class JSONStorage(StorageBackend):
+    """
+    Write-behind store that persists Cache attributes to JSON files.
+
+    Each flush rewrites every dirty attribute's file once, atomically, no matter
+    how many times it was modified since the last flush.
+    """
+
+    def __init__(self, database_paths: dict[str, str], *, flush_interval: float = 0.5):
+        super().__init__(flush_interval=flush_interval)
+        self.database_paths = database_paths
+
+    def load(self) -> Cache:
+        """
+        Loads JSON database files and returns their data as a Cache object.
+        """
+        temporary_cache = {}
+
+        for key, filepath in self.database_paths.items():
+            if not os.path.exists(filepath):  # Added in a newer version of the bot
+                continue
+
+            with open(filepath, "r") as file:
+                temporary_cache[key] = json.load(file)
+
+        self.cache = Cache(**temporary_cache)
+        return self.cache
+
+    def _snapshot(self, dirty: dict[str, set | None]) -> dict[str, str]:
+        """
+        Serializes every dirty attribute.
+        """
+        # Serialize on the event loop so the snapshot can't change mid-write. Without
+        # an indent, json uses its C encoder, which is much cheaper than the file IO.
+        # Indexes such as ReactionRoleIndex are written as a list of their entries
+        return {
+            key: json.dumps(getattr(self.cache, key), default=list) for key in dirty
+        }
+
+    def _write(self, snapshot: dict[str, str]) -> None:
+        """
+        Atomically replaces each JSON file by writing to a temporary file first.
+        """
+        for key, payload in snapshot.items():
+            filepath = self.database_paths[key]
+            directory = os.path.dirname(filepath) or "."
+
+            with tempfile.NamedTemporaryFile(
+                "w", dir=directory, suffix=".tmp", delete=False
+            ) as file:
+                file.write(payload)
+                file.flush()
+                os.fsync(file.fileno())
+
+            os.replace(file.name, filepath)
@@ -0,0 +1,506 @@
+import asyncio
+import concurrent.futures
+import functools
+import json
+import os
+import sqlite3
+
+from typing import Any, Callable
+from utils.models import Cache
+from .storage_backend import StorageBackend
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS blacklist (
+    guild_id TEXT NOT NULL,
+    word TEXT NOT NULL,
+    PRIMARY KEY (guild_id, word)
+);
+
+CREATE TABLE IF NOT EXISTS reactionroles (
+    msg_id INTEGER NOT NULL,
+    emoji TEXT NOT NULL,
+    guild_id INTEGER NOT NULL,
+    role_id INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    channel_id INTEGER,
+    PRIMARY KEY (msg_id, emoji)
+);
+
+CREATE INDEX IF NOT EXISTS reactionroles_guild_id ON reactionroles (guild_id);
+
+CREATE TABLE IF NOT EXISTS antispam (
+    guild_id TEXT NOT NULL PRIMARY KEY,
+    messages INTEGER NOT NULL,
+    seconds REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS polls (
+    msg_id INTEGER NOT NULL PRIMARY KEY,
+    channel_id INTEGER NOT NULL,
+    guild_id INTEGER NOT NULL,
+    author TEXT NOT NULL,
+    question TEXT NOT NULL,
+    options TEXT NOT NULL,
+    closes_at REAL
+);
+
+CREATE TABLE IF NOT EXISTS poll_votes (
+    msg_id INTEGER NOT NULL,
+    user_id TEXT NOT NULL,
+    emoji TEXT NOT NULL,
+    PRIMARY KEY (msg_id, user_id)
+);
+
+CREATE TABLE IF NOT EXISTS reconciled (
+    msg_id TEXT NOT NULL PRIMARY KEY,
+    reconciled_at REAL NOT NULL
+);
+"""
+
+SCHEMA_VERSION = 5
+
+# Statements that bring databases created by older versions up to date, keyed by
+# the version that needs them
+MIGRATIONS = {
+    3: "ALTER TABLE reactionroles ADD COLUMN channel_id INTEGER;",
+}
+
+POLL_COLUMNS = (
+    "msg_id",
+    "channel_id",
+    "guild_id",
+    "author",
+    "question",
+    "options",
+    "closes_at",
+)
+
+
+class SQLiteStorage(StorageBackend):
+    """
+    Write-behind store that persists the Cache to an SQLite database.
+
+    Flushes only touch the rows belonging to the items marked dirty, so write
+    latency depends on the size of the change rather than the size of the database.
+    The connection is only ever used from one dedicated thread.
+    """
+
+    def __init__(
+        self,
+        filepath: str,
+        *,
+        import_paths: dict[str, str] = None,
+        flush_interval: float = 0.5,
+    ):
+        super().__init__(flush_interval=flush_interval)
+        self.filepath = filepath
+        self.import_paths = import_paths or {}
+
+        self._connection: sqlite3.Connection = None
+        self._executor = concurrent.futures.ThreadPoolExecutor(
+            max_workers=1, thread_name_prefix="SQLiteStorage"
+        )
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """
+        Runs a blocking function on the database thread.
+        """
+        loop = asyncio.get_running_loop()
+        partial = functools.partial(func, *args)
+        return await loop.run_in_executor(self._executor, partial)
+
+    def load(self) -> Cache:
+        """
+        Opens the database, importing the JSON files on first use, and returns its
+        data as a Cache object.
+        """
+        self.cache = self._executor.submit(self._load).result()
+        return self.cache
+
+    async def close(self) -> None:
+        """
+        Forces a final flush and closes the database connection.
+        """
+        await super().close()
+
+        if self._connection is not None:
+            await self._run(self._connection.close)
+            self._connection = None
+            self._executor.shutdown()
+
+    def _load(self) -> Cache:
+        """
+        Connects to the database and reads every table.
+        """
+        self._connection = sqlite3.connect(self.filepath)
+        self._connection.execute("PRAGMA journal_mode = WAL")
+        self._connection.execute("PRAGMA synchronous = NORMAL")
+
+        (version,) = self._connection.execute("PRAGMA user_version").fetchone()
+
+        if version < SCHEMA_VERSION:
+            # executescript commits first, and sqlite3 doesn't open transactions for
+            # DDL by itself, so run each statement in one explicit transaction. A
+            # failed migration is rolled back, to be tried again on the next start
+            with self._connection:
+                self._connection.execute("BEGIN")
+                self._execute_script(SCHEMA)
+
+                if version == 0:
+                    self._import_json()
+
+                for migration_version, migration in MIGRATIONS.items():
+                    if 0 < version <= migration_version:
+                        self._execute_script(migration)
+
+                self._connection.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
+
+        blacklist = {}
+        rows = self._connection.execute("SELECT guild_id, word FROM blacklist")
+
+        for guild_id, word in rows:
+            blacklist.setdefault(guild_id, []).append(word)
+
+        rows = self._connection.execute(
+            "SELECT guild_id, name, role_id, emoji, msg_id, channel_id "
+            + "FROM reactionroles"
+        )
+
+        reactionroles = [
+            {
+                "guild_id": guild_id,
+                "name": name,
+                "role_id": role_id,
+                "emoji": emoji,
+                "msg_id": msg_id,
+                "channel_id": channel_id,
+            }
+            for guild_id, name, role_id, emoji, msg_id, channel_id in rows
+        ]
+
+        rows = self._connection.execute(
+            "SELECT guild_id, messages, seconds FROM antispam"
+        )
+
+        antispam = {
+            guild_id: {"messages": messages, "seconds": seconds}
+            for guild_id, messages, seconds in rows
+        }
+
+        columns = POLL_COLUMNS
+        rows = self._connection.execute(f"SELECT {', '.join(columns)} FROM polls")
+        polls = {}
+
+        for row in rows:
+            entry = dict(zip(columns, row))
+            entry["options"] = json.loads(entry["options"])
+            entry["votes"] = {}
+
+            polls[entry["msg_id"]] = entry
+
+        rows = self._connection.execute("SELECT msg_id, user_id, emoji FROM poll_votes")
+
+        for msg_id, user_id, emoji in rows:
+            if msg_id in polls:
+                polls[msg_id]["votes"][user_id] = emoji
+
+        rows = self._connection.execute("SELECT msg_id, reconciled_at FROM reconciled")
+        reconciled = dict(rows.fetchall())
+
+        return Cache(
+            blacklist=blacklist,
+            reactionroles=reactionroles,
+            antispam=antispam,
+            polls=list(polls.values()),
+            reconciled=reconciled,
+        )
+
+    def _execute_script(self, script: str) -> None:
+        """
+        Runs each statement in an SQL script, in the current transaction.
+        """
+        for statement in script.split(";"):
+            if statement.strip():
+                self._connection.execute(statement)
+
+    def _import_json(self) -> None:
+        """
+        One-shot import of the JSON database files into a newly created database.
+        """
+        data = {}
+
+        for key, filepath in self.import_paths.items():
+            if os.path.exists(filepath):
+                with open(filepath, "r") as file:
+                    data[key] = json.load(file)
+
+        self._connection.executemany(
+            "INSERT OR IGNORE INTO blacklist (guild_id, word) VALUES (?, ?)",
+            [
+                (guild_id, word)
+                for guild_id, words in data.get("blacklist", {}).items()
+                for word in words
+            ],
+        )
+
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO reactionroles "
+            + "(msg_id, emoji, guild_id, role_id, name, channel_id) "
+            + "VALUES (:msg_id, :emoji, :guild_id, :role_id, :name, :channel_id)",
+            [{"channel_id": None} | item for item in data.get("reactionroles", [])],
+        )
+
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO antispam (guild_id, messages, seconds) "
+            + "VALUES (?, ?, ?)",
+            [
+                (guild_id, settings["messages"], settings["seconds"])
+                for guild_id, settings in data.get("antispam", {}).items()
+            ],
+        )
+
+        for entry in data.get("polls", []):
+            self._write_poll(entry["msg_id"], entry)
+
+        self._write_reconciled(data.get("reconciled", {}), False)
+
+    def _snapshot(self, dirty: dict[str, set | None]) -> dict[str, tuple[dict, bool]]:
+        """
+        Copies the rows belonging to each dirty item, grouped by item. The flag
+        says whether the whole attribute was dirty.
+        """
+        snapshot = {}
+
+        if "blacklist" in dirty:
+            blacklist = self.cache.blacklist
+            guild_ids = dirty["blacklist"] or blacklist.keys()
+
+            # Guilds that are no longer in the blacklist map to an empty set, which
+            # deletes all of their rows
+            guilds = {
+                guild_id: set(blacklist.get(guild_id, ())) for guild_id in guild_ids
+            }
+            snapshot["blacklist"] = (guilds, dirty["blacklist"] is None)
+
+        if "reactionroles" in dirty:
+            reactionroles = self.cache.reactionroles
+            msg_ids = dirty["reactionroles"] or {
+                item["msg_id"] for item in reactionroles
+            }
+
+            messages = {
+                msg_id: {
+                    emoji: dict(item)
+                    for emoji, item in reactionroles.message(msg_id).items()
+                }
+                for msg_id in msg_ids
+            }
+
+            snapshot["reactionroles"] = (messages, dirty["reactionroles"] is None)
+
+        if "antispam" in dirty:
+            antispam = self.cache.antispam
+            guild_ids = dirty["antispam"] or antispam.keys()
+
+            # Guilds that turned anti-spam off map to an empty dictionary
+            guilds = {
+                guild_id: dict(antispam.get(guild_id, {})) for guild_id in guild_ids
+            }
+            snapshot["antispam"] = (guilds, dirty["antispam"] is None)
+
+        if "polls" in dirty:
+            polls = self.cache.polls
+            msg_ids = dirty["polls"] or {entry["msg_id"] for entry in polls}
+
+            # Polls that have closed or been deleted map to None
+            entries = {}
+
+            for msg_id in msg_ids:
+                entry = polls.get(msg_id)
+                entries[msg_id] = entry and entry | {"votes": dict(entry["votes"])}
+            snapshot["polls"] = (entries, dirty["polls"] is None)
+
+        if "reconciled" in dirty:
+            reconciled = self.cache.reconciled
+            msg_ids = dirty["reconciled"] or reconciled.keys()
+
+            # Messages that are no longer tracked map to None
+            times = {msg_id: reconciled.get(msg_id) for msg_id in msg_ids}
+            snapshot["reconciled"] = (times, dirty["reconciled"] is None)
+
+        return snapshot
+
+    def _write(self, snapshot: dict[str, tuple[dict, bool]]) -> None:
+        """
+        Applies a snapshot in a single transaction, upserting or deleting only the
+        rows that changed.
+        """
+        with self._connection:
+            if "blacklist" in snapshot:
+                self._write_blacklist(*snapshot["blacklist"])
+
+            if "reactionroles" in snapshot:
+                self._write_reactionroles(*snapshot["reactionroles"])
+
+            if "antispam" in snapshot:
+                self._write_antispam(*snapshot["antispam"])
+
+            if "polls" in snapshot:
+                self._write_polls(*snapshot["polls"])
+
+            if "reconciled" in snapshot:
+                self._write_reconciled(*snapshot["reconciled"])
+
+    def _write_blacklist(self, guilds: dict[str, set], full: bool) -> None:
+        """
+        Brings the blacklist rows for each guild in line with the cache.
+        """
+        if full:  # Guilds missing from the cache entirely need to be removed too
+            rows = self._connection.execute("SELECT DISTINCT guild_id FROM blacklist")
+            guilds |= {
+                guild_id: set() for (guild_id,) in rows if guild_id not in guilds
+            }
+
+        for guild_id, words in guilds.items():
+            rows = self._connection.execute(
+                "SELECT word FROM blacklist WHERE guild_id = ?", (guild_id,)
+            )
+            stored = {word for (word,) in rows}
+
+            self._connection.executemany(
+                "INSERT OR IGNORE INTO blacklist (guild_id, word) VALUES (?, ?)",
+                [(guild_id, word) for word in words - stored],
+            )
+
+            self._connection.executemany(
+                "DELETE FROM blacklist WHERE guild_id = ? AND word = ?",
+                [(guild_id, word) for word in stored - words],
+            )
+
+    def _write_reactionroles(self, messages: dict[int, dict], full: bool) -> None:
+        """
+        Brings the reaction role rows for each message in line with the cache.
+        """
+        if full:
+            rows = self._connection.execute("SELECT DISTINCT msg_id FROM reactionroles")
+            messages |= {msg_id: {} for (msg_id,) in rows if msg_id not in messages}
+
+        for msg_id, items in messages.items():
+            rows = self._connection.execute(
+                "SELECT emoji FROM reactionroles WHERE msg_id = ?", (msg_id,)
+            )
+            stored = {emoji for (emoji,) in rows}
+
+            self._connection.executemany(
+                "INSERT INTO reactionroles "
+                + "(msg_id, emoji, guild_id, role_id, name, channel_id) "
+                + "VALUES (:msg_id, :emoji, :guild_id, :role_id, :name, :channel_id) "
+                + "ON CONFLICT (msg_id, emoji) DO UPDATE SET "
+                + "guild_id = excluded.guild_id, role_id = excluded.role_id, "
+                + "name = excluded.name, channel_id = excluded.channel_id",
+                # Entries created before channels were stored don't have one
+                [{"channel_id": None} | item for item in items.values()],
+            )
+
+            self._connection.executemany(
+                "DELETE FROM reactionroles WHERE msg_id = ? AND emoji = ?",
+                [(msg_id, emoji) for emoji in stored - items.keys()],
+            )
+
+    def _write_antispam(self, guilds: dict[str, dict], full: bool) -> None:
+        """
+        Upserts the anti-spam settings for each guild, or deletes them if it's off.
+        """
+        if full:
+            self._connection.execute(
+                "DELETE FROM antispam WHERE guild_id NOT IN "
+                + f"({', '.join('?' * len(guilds))})",
+                list(guilds),
+            )
+
+        for guild_id, settings in guilds.items():
+            if not settings:
+                self._connection.execute(
+                    "DELETE FROM antispam WHERE guild_id = ?", (guild_id,)
+                )
+                continue
+
+            self._connection.execute(
+                "INSERT INTO antispam (guild_id, messages, seconds) VALUES (?, ?, ?) "
+                + "ON CONFLICT (guild_id) DO UPDATE SET "
+                + "messages = excluded.messages, seconds = excluded.seconds",
+                (guild_id, settings["messages"], settings["seconds"]),
+            )
+
+    def _write_polls(self, entries: dict[int, dict | None], full: bool) -> None:
+        """
+        Brings the rows for each poll and its votes in line with the cache.
+        """
+        if full:
+            rows = self._connection.execute("SELECT msg_id FROM polls")
+            entries |= {msg_id: None for (msg_id,) in rows if msg_id not in entries}
+
+        for msg_id, entry in entries.items():
+            self._write_poll(msg_id, entry)
+
+    def _write_poll(self, msg_id: int, entry: dict | None) -> None:
+        """
+        Upserts a poll and only the votes that changed, or deletes it if it's gone.
+        """
+        if entry is None:
+            self._connection.execute("DELETE FROM polls WHERE msg_id = ?", (msg_id,))
+            self._connection.execute(
+                "DELETE FROM poll_votes WHERE msg_id = ?", (msg_id,)
+            )
+            return
+
+        # Only the close time can change after a poll is created
+        self._connection.execute(
+            f"INSERT INTO polls ({', '.join(POLL_COLUMNS)}) "
+            + f"VALUES ({', '.join('?' * len(POLL_COLUMNS))}) "
+            + "ON CONFLICT (msg_id) DO UPDATE SET closes_at = excluded.closes_at",
+            [
+                json.dumps(entry[column]) if column == "options" else entry[column]
+                for column in POLL_COLUMNS
+            ],
+        )
+
+        rows = self._connection.execute(
+            "SELECT user_id, emoji FROM poll_votes WHERE msg_id = ?", (msg_id,)
+        )
+        stored, votes = dict(rows.fetchall()), entry["votes"]
+
+        self._connection.executemany(
+            "INSERT INTO poll_votes (msg_id, user_id, emoji) VALUES (?, ?, ?) "
+            + "ON CONFLICT (msg_id, user_id) DO UPDATE SET emoji = excluded.emoji",
+            [
+                (msg_id, user_id, emoji)
+                for user_id, emoji in votes.items()
+                if stored.get(user_id) != emoji
+            ],
+        )
+
+        self._connection.executemany(
+            "DELETE FROM poll_votes WHERE msg_id = ? AND user_id = ?",
+            [(msg_id, user_id) for user_id in stored.keys() - votes.keys()],
+        )
+
+    def _write_reconciled(self, times: dict[str, float | None], full: bool) -> None:
+        """
+        Upserts when each message was last reconciled, or deletes it if it's gone.
+        """
+        if full:
+            rows = self._connection.execute("SELECT msg_id FROM reconciled")
+            times |= {msg_id: None for (msg_id,) in rows if msg_id not in times}
+
+        self._connection.executemany(
+            "INSERT INTO reconciled (msg_id, reconciled_at) VALUES (?, ?) "
+            + "ON CONFLICT (msg_id) DO UPDATE SET "
+            + "reconciled_at = excluded.reconciled_at",
+            [(msg_id, time) for msg_id, time in times.items() if time is not None],
+        )
+
+        self._connection.executemany(
+            "DELETE FROM reconciled WHERE msg_id = ?",
+            [(msg_id,) for msg_id, time in times.items() if time is None],
+        )
@@ -0,0 +1,111 @@
+import asyncio
+import functools
+import sys
+
+from typing import Any, Callable
+from utils.models import Cache
+
+
+class StorageBackend:
+    """
+    Base class for write-behind stores that persist the Cache.
+
+    Mutations only mark Cache attributes (or items in them) as dirty. A background
+    task collects everything marked dirty since the last flush and hands it to the
+    backend once, off the event loop, so bursts of changes never block it on IO.
+    """
+
+    def __init__(self, *, flush_interval: float = 0.5):
+        self.flush_interval = flush_interval
+        self.cache: Cache = None
+
+        self._task: asyncio.Task = None
+        self._closing: asyncio.Event = None
+
+    def load(self) -> Cache:
+        """
+        Loads the database and returns its data as a Cache object.
+        """
+        raise NotImplementedError
+
+    def _snapshot(self, dirty: dict[str, set | None]) -> Any:
+        """
+        Copies the dirty data out of the cache. Runs on the event loop.
+        """
+        raise NotImplementedError
+
+    def _write(self, snapshot: Any) -> None:
+        """
+        Persists a snapshot returned by _snapshot. Runs off the event loop.
+        """
+        raise NotImplementedError
+
+    async def _run(self, func: Callable, *args) -> Any:
+        """
+        Runs a blocking function in an executor.
+        """
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(None, functools.partial(func, *args))
+
+    def start(self) -> None:
+        """
+        Starts the background task that flushes dirty data.
+        """
+        if self._task is not None and not self._task.done():
+            return
+
+        self._closing = asyncio.Event()
+        self._task = asyncio.create_task(self._flush_loop())
+
+    async def close(self) -> None:
+        """
+        Stops the background task and forces a final flush.
+        """
+        if self._task is None or self._task.done():
+            return await self.flush()
+
+        self._closing.set()
+        await self._task
+
+    async def _flush_loop(self) -> None:
+        """
+        Flushes dirty data every flush_interval seconds until closed, and once more
+        when it is.
+        """
+        while not self._closing.is_set():
+            try:
+                await asyncio.wait_for(self._closing.wait(), self.flush_interval)
+            except asyncio.TimeoutError:
+                await self._try_flush()
+
+        # Also runs if close() was called before the loop first checked
+        await self._try_flush()
+
+    async def _try_flush(self) -> None:
+        """
+        Flushes dirty data, logging any error instead of raising it.
+        """
+        try:
+            await self.flush()
+        except Exception as error:
+            print(f"Failed to write to the database: {error}", file=sys.stderr)
+
+    async def flush(self) -> None:
+        """
+        Persists everything marked dirty since the last flush.
+        """
+        if self.cache is None or not self.cache.dirty:
+            return
+
+        dirty = self.cache.dirty
+        snapshot = self._snapshot(dirty)
+        self.cache.dirty = {}
+
+        try:
+            await self._run(self._write, snapshot)
+        except Exception:
+            # Try again on the next flush
+            for key, items in dirty.items():
+                self.cache.mark_dirty(key, *(items or ()))
+
+            raise
@@ -0,0 +1,26 @@
+from .storage_backend import StorageBackend
+from .json_storage import JSONStorage
+from .sqlite_storage import SQLiteStorage
+
+
+def create_storage(
+    database_paths: dict[str, str], *, flush_interval: float = 0.5
+) -> StorageBackend:
+    """
+    Returns the storage backend selected by the database paths in config.json.
+
+    If an "sqlite" path is given, the bot uses an SQLite database at that path and
+    the other paths are only used to import existing JSON data on first run.
+    """
+    if "sqlite" not in database_paths:
+        return JSONStorage(database_paths, flush_interval=flush_interval)
+
+    import_paths = {
+        key: filepath for key, filepath in database_paths.items() if key != "sqlite"
+    }
+
+    return SQLiteStorage(
+        database_paths["sqlite"],
+        import_paths=import_paths,
+        flush_interval=flush_interval,
+    )
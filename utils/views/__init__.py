@@ -1,3 +1,4 @@
 from .blacklist_add_view import BlacklistAddView
 from .blacklist_remove_view import BlacklistRemoveView
-from .clear_messages_view import ClearMessagesView
\ No newline at end of file
+from .clear_messages_view import ClearMessagesView
+from .queue_view import QueueView
@@ -2,10 +2,9 @@ import discord
 
 from discord.ext import commands
 from typing import Optional
+from utils.models import BlacklistMatcher
 from utils import BlacklistAddDropdown, BlacklistAddModal
 
-FILEPATH = "files/blacklist.json"
-
 
 class BlacklistAddView(discord.ui.View):
     def __init__(self, ctx: commands.Context, *, timeout: Optional[float] = 180):
@@ -52,7 +51,7 @@ class BlacklistAddView(discord.ui.View):
     )
     async def submit(self, interaction: discord.Interaction, button: discord.Button):
         await interaction.response.defer()
-        values = [value.lower() for value in self.drop.words]
+        values = [BlacklistMatcher.normalize_entry(value) for value in self.drop.words]
         id = str(interaction.guild_id)
         if not values:
             print(values)
@@ -60,6 +59,14 @@ class BlacklistAddView(discord.ui.View):
                 f"❌ You need to have at least one word selected!",
                 ephemeral=True,
             )
+        for value in values:
+            try:
+                BlacklistMatcher.validate_entry(value)
+            except ValueError as error:
+                return await interaction.followup.send(
+                    f"❌ `{value}` can't be blacklisted. {error}",
+                    ephemeral=True,
+                )
         blacklist = interaction.client.cache.blacklist
         if id not in blacklist.keys():
             blacklist[id] = []
@@ -70,7 +77,7 @@ class BlacklistAddView(discord.ui.View):
                 ephemeral=True,
             )
         blacklist[id].extend(words)
-        interaction.client.update_json(FILEPATH, blacklist)
+        interaction.client.cache.mark_dirty("blacklist", id)
         embed = discord.Embed(
             title=f"🛠️ Words Successfully Added",
             description=" ".join(f"`{word}`" for word in words),
@@ -82,5 +89,7 @@ class BlacklistAddView(discord.ui.View):
 
     @discord.ui.button(label="Abort", style=discord.ButtonStyle.red, emoji="👎🏻")
     async def abort(self, interaction: discord.Interaction, button: discord.Button):
-        await interaction.response.send_message(f"👍🏻 Aborting command.", ephemeral=True)
+        await interaction.response.send_message(
+            f"👍🏻 Aborting command.", ephemeral=True
+        )
         await self.disable_all_buttons(interaction)
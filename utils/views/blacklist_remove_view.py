@@ -2,10 +2,9 @@ import discord
 
 from discord.ext import commands
 from typing import Optional
+from utils.models import BlacklistMatcher
 from utils import BlacklistRemoveDropdown, BlacklistRemoveModal
 
-FILEPATH = "files/blacklist.json"
-
 
 class BlacklistRemoveView(discord.ui.View):
     def __init__(self, ctx: commands.Context, *, timeout: Optional[float] = 180):
@@ -53,7 +52,7 @@ class BlacklistRemoveView(discord.ui.View):
     async def submit(self, interaction: discord.Interaction, button: discord.Button):
         await interaction.response.defer()
 
-        values = [value.lower() for value in self.drop.words]
+        values = [BlacklistMatcher.normalize_entry(value) for value in self.drop.words]
         id = str(interaction.guild.id)
 
         if not values:
@@ -85,7 +84,7 @@ class BlacklistRemoveView(discord.ui.View):
         for word in words:
             blacklist[id].remove(word)
 
-        interaction.client.update_json(FILEPATH, blacklist)
+        interaction.client.cache.mark_dirty("blacklist", id)
 
         embed = discord.Embed(
             title=f"🛠️ Words Successfully Removed",
@@ -100,5 +99,7 @@ class BlacklistRemoveView(discord.ui.View):
 
     @discord.ui.button(label="Abort", style=discord.ButtonStyle.red, emoji="👎🏻")
     async def abort(self, interaction: discord.Interaction, button: discord.Button):
-        await interaction.response.send_message(f"👍🏻 Aborting command.", ephemeral=True)
+        await interaction.response.send_message(
+            f"👍🏻 Aborting command.", ephemeral=True
+        )
         await self.disable_all_buttons(interaction)
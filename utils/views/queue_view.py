@@ -0,0 +1,114 @@
+import discord
+
+from discord.ext import commands
+from typing import Optional
+
+
+def format_duration(seconds: int) -> str:
+    """
+    Formats a number of seconds as h:mm:ss, or m:ss if it's under an hour.
+    """
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+
+    if hours:
+        return f"{hours}:{minutes:02}:{seconds:02}"
+
+    return f"{minutes}:{seconds:02}"
+
+
+class QueueView(discord.ui.View):
+    """
+    Shows a music queue a page at a time, with buttons to flip between pages. Each
+    page is read from the queue when it's shown, so it stays up to date as songs
+    are added and played.
+    """
+
+    def __init__(
+        self,
+        ctx: commands.Context,
+        queue,
+        *,
+        page: int = 0,
+        per_page: int = 10,
+        timeout: Optional[float] = 180,
+    ):
+        super().__init__(timeout=timeout)
+        self.ctx = ctx
+        self.queue = queue
+        self.page = page
+        self.per_page = per_page
+        self.message: discord.Message = None
+
+    @property
+    def pages(self) -> int:
+        return max(1, -(-len(self.queue) // self.per_page))
+
+    def embed(self) -> discord.Embed:
+        """
+        Creates an embed showing the current page, and updates the buttons.
+        """
+        self.page = min(max(self.page, 0), self.pages - 1)
+        start = self.page * self.per_page
+        songs = self.queue.page(self.page, self.per_page)
+
+        lines = []
+
+        for position, song in enumerate(songs, start + 1):
+            duration = self.queue.song_duration(song)
+            length = f" `{format_duration(duration)}`" if duration else ""
+            lines.append(f'➡️ **{position}**: {song["title"]}{length}')
+
+        embed = discord.Embed(
+            title=f"🎧 Music Queue | {len(self.queue)} Songs",
+            description="\n\n".join(lines) or "There are no more queued songs.",
+        )
+        embed.set_footer(
+            text=f"📄 Page {self.page + 1}/{self.pages} | "
+            + f"⏱️ {format_duration(self.queue.duration)} in total"
+        )
+
+        self.previous_page.disabled = self.page == 0
+        self.next_page.disabled = self.page == self.pages - 1
+
+        return embed
+
+    async def on_timeout(self) -> None:
+        """
+        Called when the view times out.
+        """
+        for child in self.children:
+            child.disabled = True
+
+        try:
+            await self.message.edit(view=self)
+        except (AttributeError, discord.HTTPException):  # Deleted, or never sent
+            pass
+
+    async def interaction_check(self, interaction: discord.Interaction) -> bool:
+        """
+        Prevents users who weren't the command sender from using buttons.
+        """
+        if interaction.user.id == self.ctx.author.id:
+            return True
+        else:
+            await interaction.response.send_message(
+                ":x: This isn't your interaction!", ephemeral=True
+            )
+            return False
+
+    @discord.ui.button(emoji="◀️", style=discord.ButtonStyle.blurple)
+    async def previous_page(self, interaction: discord.Interaction, _: discord.Button):
+        """
+        Callback method for the previous page button.
+        """
+        self.page -= 1
+        await interaction.response.edit_message(embed=self.embed(), view=self)
+
+    @discord.ui.button(emoji="▶️", style=discord.ButtonStyle.blurple)
+    async def next_page(self, interaction: discord.Interaction, _: discord.Button):
+        """
+        Callback method for the next page button.
+        """
+        self.page += 1
+        await interaction.response.edit_message(embed=self.embed(), view=self)
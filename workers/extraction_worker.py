@@ -0,0 +1,111 @@
+import os
+
+from urllib import parse
+from youtube_dl import YoutubeDL
+
+# Functions run in the music cog's extraction and download worker processes, which
+# import this module when they're spawned. It's kept out of the cogs package and
+# only imports youtube_dl, so workers don't also import discord.py and the bot
+
+ytdl_options = {
+    # Opus streams can be played without transcoding them
+    "format": "bestaudio[acodec=opus]/bestaudio/best",
+    "outtmpl": "downloads/%(extractor)s-%(id)s-%(title)s.%(ext)s",
+    "restrictfilenames": True,
+    "noplaylist": True,
+    "nocheckcertificate": True,
+    "ignoreerrors": False,
+    "logtostderr": False,
+    "quiet": True,
+    "no_warnings": True,
+    "default_search": "auto",
+    "source_address": "0.0.0.0",
+}
+
+ytdl = YoutubeDL(ytdl_options)
+
+# Large fields that aren't used once a format has been chosen. Dropping them keeps
+# results cheap to send back from the worker process
+UNUSED_FIELDS = ("formats", "thumbnails", "subtitles", "automatic_captions")
+
+# Playlists are only read this far, so a huge one can't flood the queue
+MAX_PLAYLIST_SONGS = 500
+
+# Lists a playlist's songs without extracting each of them
+playlist_ytdl = YoutubeDL(
+    ytdl_options
+    | {
+        "extract_flat": "in_playlist",
+        "noplaylist": False,
+        "playlistend": MAX_PLAYLIST_SONGS,
+    }
+)
+
+
+def extract_info(query: str) -> dict:
+    """
+    Extracts the metadata and stream URL for a search or URL, using the first result
+    of a search or playlist. Runs in an extraction worker process.
+    """
+    data = ytdl.extract_info(url=query, download=False)
+
+    if "entries" in data:
+        data = data["entries"][0]
+
+    for field in UNUSED_FIELDS:
+        data.pop(field, None)
+
+    return data
+
+
+def extract_playlist(url: str) -> dict:
+    """
+    Lists the songs in a playlist, with just their title, URL and length, which
+    takes a single request rather than one per song. The result has the playlist's
+    title and its songs under "entries". Runs in an extraction worker process.
+    """
+    data = playlist_ytdl.extract_info(url=url, download=False)
+    entries = data.get("entries")
+
+    if entries is None:  # Not a playlist after all
+        return {"title": data.get("title"), "entries": [_playlist_entry(data)]}
+
+    entries = (_playlist_entry(entry) for entry in entries if entry)
+
+    return {
+        "title": data.get("title"),
+        "entries": [entry for entry in entries if entry["webpage_url"]],
+    }
+
+
+def _playlist_entry(entry: dict) -> dict:
+    """
+    Returns the parts of a playlist entry needed to queue it.
+    """
+    url = entry.get("webpage_url") or entry.get("url")
+
+    # YouTube's flat entries only give the video ID
+    if url and entry.get("ie_key") == "Youtube" and not parse.urlparse(url).scheme:
+        url = f"https://www.youtube.com/watch?v={url}"
+
+    return {
+        "title": entry.get("title") or url,
+        "webpage_url": url,
+        "duration": entry.get("duration"),
+    }
+
+
+def download_audio(url: str, directory: str, name: str) -> str:
+    """
+    Downloads a song's audio into a directory and returns the file's path. The file
+    is named after name and the audio codec, as "<name>.<acodec>.<ext>". Runs in a
+    download worker process.
+    """
+    options = ytdl_options | {
+        "outtmpl": os.path.join(directory, f"{name}.%(acodec)s.%(ext)s"),
+        "format": "bestaudio[acodec=opus]/bestaudio",
+    }
+    downloader = YoutubeDL(options)
+    data = downloader.extract_info(url=url, download=True)
+
+    return downloader.prepare_filename(data)